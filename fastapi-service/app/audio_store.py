@@ -0,0 +1,187 @@
+"""
+Object storage for synthesized audio, with content-addressed keys and signed URL caching
+"""
+
+import abc
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Optional, Tuple
+
+# "gcs" (Google Cloud Storage) or "local" (files served by the API itself)
+AUDIO_STORE = os.getenv("AUDIO_STORE", "gcs").lower()
+AUDIO_STORE_DIR = os.getenv(
+    "AUDIO_STORE_DIR", os.path.join(os.path.dirname(__file__), "data", "audio_store")
+)
+AUDIO_STORE_BASE_URL = os.getenv("AUDIO_STORE_BASE_URL", "")
+AUDIO_URL_TTL = int(os.getenv("AUDIO_URL_TTL", "3600"))
+# Hand out a cached URL only if it stays valid for at least this long
+AUDIO_URL_MIN_REMAINING = int(os.getenv("AUDIO_URL_MIN_REMAINING", "300"))
+AUDIO_URL_CACHE_SIZE = int(os.getenv("AUDIO_URL_CACHE_SIZE", "4096"))
+
+
+def audio_object_key(text: str, voice: str, engine: str) -> str:
+    """Content address for a clip: identical inputs always map to the same object."""
+    payload = "\x1f".join([engine, voice, text])
+    return f"audio/{hashlib.sha256(payload.encode('utf-8')).hexdigest()}.mp3"
+
+
+class AudioStore(abc.ABC):
+    """Base class: existence checks and signed URLs are cached per object key.
+
+    Subclasses implement _stat (size or None), _put and _sign.
+    """
+
+    def __init__(self, url_ttl: int = AUDIO_URL_TTL):
+        self.url_ttl = url_ttl
+        # key -> (url, expires_at, size)
+        self._urls: "OrderedDict[str, Tuple[str, float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @abc.abstractmethod
+    def _stat(self, key: str) -> Optional[int]:
+        """Size of the stored object in bytes, or None if it does not exist."""
+
+    @abc.abstractmethod
+    def _put(self, key: str, data: bytes, content_type: str):
+        """Store an object under key."""
+
+    @abc.abstractmethod
+    def _sign(self, key: str) -> str:
+        """A URL the client can fetch the object from."""
+
+    def _remember(self, key: str, url: str, size: int):
+        with self._lock:
+            self._urls[key] = (url, time.time() + self.url_ttl, size)
+            self._urls.move_to_end(key)
+            while len(self._urls) > AUDIO_URL_CACHE_SIZE:
+                self._urls.popitem(last=False)
+
+    def cached_url(self, key: str) -> Optional[Tuple[str, int]]:
+        """(url, size) for an object that is already stored, else None (blocking).
+
+        A cached URL is reused until shortly before it expires. Otherwise the
+        object's existence is checked once and a fresh URL is signed.
+        """
+        with self._lock:
+            entry = self._urls.get(key)
+        if entry:
+            url, expires_at, size = entry
+            if expires_at - time.time() > AUDIO_URL_MIN_REMAINING:
+                return url, size
+        else:
+            size = self._stat(key)
+            if size is None:
+                return None
+
+        url = self._sign(key)
+        self._remember(key, url, size)
+        return url, size
+
+    def upload(
+        self, key: str, data: bytes, content_type: str = "audio/mpeg"
+    ) -> Tuple[str, int]:
+        """Store an object (unless it already exists) and return (url, size)."""
+        existing = self.cached_url(key)
+        if existing:
+            return existing
+        self._put(key, data, content_type)
+        url = self._sign(key)
+        self._remember(key, url, len(data))
+        return url, len(data)
+
+
+class GCSAudioStore(AudioStore):
+    """Google Cloud Storage bucket with V4 signed URLs.
+
+    One storage client is created lazily and reused. Setting
+    STORAGE_EMULATOR_HOST points it at a fake GCS server for testing.
+    """
+
+    def __init__(self, bucket_name: str, url_ttl: int = AUDIO_URL_TTL):
+        super().__init__(url_ttl)
+        self.bucket_name = bucket_name
+        self._bucket = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def bucket(self):
+        if self._bucket is None:
+            with self._client_lock:
+                if self._bucket is None:
+                    from google.cloud import storage
+
+                    self._bucket = storage.Client().bucket(self.bucket_name)
+        return self._bucket
+
+    def _stat(self, key: str) -> Optional[int]:
+        blob = self.bucket.get_blob(key)
+        return blob.size if blob is not None else None
+
+    def _put(self, key: str, data: bytes, content_type: str):
+        from google.api_core.exceptions import PreconditionFailed
+
+        blob = self.bucket.blob(key)
+        # Objects never change under a content-addressed key
+        blob.cache_control = "private, max-age=31536000, immutable"
+        try:
+            # Only create: a concurrent upload of the same clip already won
+            blob.upload_from_string(
+                data, content_type=content_type, if_generation_match=0
+            )
+        except PreconditionFailed:
+            pass
+
+    def _sign(self, key: str) -> str:
+        return self.bucket.blob(key).generate_signed_url(
+            version="v4", expiration=timedelta(seconds=self.url_ttl)
+        )
+
+
+class LocalAudioStore(AudioStore):
+    """Files in a local directory, served by the API under /audio/."""
+
+    def __init__(
+        self,
+        directory: str = AUDIO_STORE_DIR,
+        base_url: str = AUDIO_STORE_BASE_URL,
+        url_ttl: int = AUDIO_URL_TTL,
+    ):
+        super().__init__(url_ttl)
+        self.directory = directory
+        self.base_url = base_url.rstrip("/")
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, *key.split("/"))
+
+    def _stat(self, key: str) -> Optional[int]:
+        try:
+            return os.path.getsize(self.path(key))
+        except OSError:
+            return None
+
+    def _put(self, key: str, data: bytes, content_type: str):
+        path = self.path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _sign(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+
+def create_audio_store(backend: str = AUDIO_STORE) -> AudioStore:
+    if backend == "local":
+        return LocalAudioStore()
+    if backend == "gcs":
+        return GCSAudioStore(os.getenv("BUCKET_NAME", ""))
+    raise ValueError(f"Unknown AUDIO_STORE backend: {backend}")
+
+
+# Global instance
+audio_store = create_audio_store()
@@ -0,0 +1,280 @@
+"""
+Versioned in-memory chore catalog
+"""
+
+import bisect
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from database import get_all_chores, get_data_version, get_write_generation
+
+try:
+    import orjson
+
+    def encode_json(obj) -> bytes:
+        return orjson.dumps(obj)
+
+except ImportError:
+
+    def encode_json(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode(
+            "utf-8"
+        )
+
+
+CHORE_FIELDS = ("id", "title", "items", "steps", "time_min")
+MAX_PAGE_SIZE = 500
+
+# How often to ask SQLite whether another process changed the data (seconds)
+CATALOG_CHECK_INTERVAL = float(os.getenv("CATALOG_CHECK_INTERVAL", "1.0"))
+
+
+def parse_fields(fields: str) -> Optional[Tuple[str, ...]]:
+    """Parse a fields= projection. Always includes id; None means every field."""
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(CHORE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    requested.add("id")
+    return tuple(name for name in CHORE_FIELDS if name in requested)
+
+
+def project(chores: Sequence[Dict], fields: Optional[Tuple[str, ...]]) -> List[Dict]:
+    """Keep only the requested fields (plus a search result's "match")."""
+    if fields is None:
+        return list(chores)
+    projected = []
+    for chore in chores:
+        row = {name: chore.get(name) for name in fields}
+        if "match" in chore:
+            row["match"] = chore["match"]
+        projected.append(row)
+    return projected
+
+
+class EncodedBody(NamedTuple):
+    """A pre-serialized JSON response body and its strong ETag."""
+
+    content: bytes
+    etag: str
+
+
+def encode_body(obj) -> EncodedBody:
+    content = encode_json(obj)
+    return EncodedBody(content, f'"{hashlib.sha256(content).hexdigest()[:32]}"')
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as If-None-Match requires (RFC 9110 13.1.2)
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def encoded_response(
+    request: Request,
+    body: EncodedBody,
+    cache_control: str,
+    cache_status: str = "HIT",
+) -> Response:
+    """Serve pre-encoded JSON, or 304 Not Modified if the client's copy is current."""
+    headers = {
+        "ETag": body.etag,
+        "Cache-Control": cache_control,
+        "X-Cache-Status": cache_status,
+    }
+    if etag_matches(request.headers.get("if-none-match"), body.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=body.content, media_type="application/json", headers=headers
+    )
+
+
+class _Snapshot:
+    """One immutable version of the catalog plus its lazily encoded bodies."""
+
+    def __init__(self, chores: List[Dict], db_version, version: int):
+        self.chores = chores
+        self.by_id = {chore["id"]: chore for chore in chores}
+        # Primary-key order for keyset pagination
+        self.sorted_ids = sorted(self.by_id)
+        self.db_version = db_version
+        self.version = version
+        self.list_body: Optional[EncodedBody] = None
+        self.chore_bodies: Dict[str, EncodedBody] = {}
+        self.named_bodies: Dict[str, EncodedBody] = {}
+
+
+class ChoreCatalog:
+    """All chores held in memory as an id index plus the list view.
+
+    Writes made through database.py in this process, and changes from other
+    processes (e.g. manage_db.py, detected via PRAGMA data_version at most
+    every CATALOG_CHECK_INTERVAL seconds), trigger a reload on one long-lived
+    refresher thread, which keeps reusing its pooled connection. Readers keep the previous snapshot until the new one is swapped
+    in, so they never wait on the database. Response bodies are JSON-encoded
+    once per catalog version.
+    """
+
+    def __init__(self, check_interval: float = CATALOG_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._snapshot: Optional[_Snapshot] = None
+        self._checked_at = 0.0
+        self._refresh_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._refresher = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="catalog"
+        )
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version if self._snapshot else 0
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload from the database if it changed (blocking). Returns True if reloaded."""
+        with self._refresh_lock:
+            db_version = get_data_version()
+            self._checked_at = time.monotonic()
+            current = self._snapshot
+            if not force and current and db_version == current.db_version:
+                return False
+
+            # Swap in a whole new snapshot so readers never see a mix of versions
+            self._snapshot = _Snapshot(get_all_chores(), db_version, self.version + 1)
+            return True
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        self._refresher.submit(self._background_refresh)
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"Error refreshing chore catalog: {e}")
+            self._checked_at = time.monotonic()
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _current(self) -> _Snapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            # Nothing to serve yet (normally preloaded at startup)
+            self.refresh()
+            return self._snapshot
+        if (
+            get_write_generation() != snapshot.db_version[0]
+            or time.monotonic() - self._checked_at >= self.check_interval
+        ):
+            self._refresh_in_background()
+        return snapshot
+
+    def all(self) -> List[Dict]:
+        """List view of every chore (shared; do not mutate)."""
+        return self._current().chores
+
+    def get(self, chore_id: str) -> Optional[Dict]:
+        return self._current().by_id.get(chore_id)
+
+    def get_many(self, ids: Sequence[str]) -> Tuple[List[Dict], List[str]]:
+        """Resolve ids against one catalog version: (found chores, missing ids)."""
+        by_id = self._current().by_id
+        found, missing = [], []
+        for chore_id in dict.fromkeys(ids):
+            chore = by_id.get(chore_id)
+            if chore is None:
+                missing.append(chore_id)
+            else:
+                found.append(chore)
+        return found, missing
+
+    def list_body(self) -> EncodedBody:
+        """The encoded {"chores": [...]} response for the current version."""
+        return self._list_body(self._current())
+
+    @staticmethod
+    def _list_body(snapshot: _Snapshot) -> EncodedBody:
+        if snapshot.list_body is None:
+            snapshot.list_body = encode_body({"chores": snapshot.chores})
+        return snapshot.list_body
+
+    def page_body(
+        self,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> EncodedBody:
+        """One page of chores in id order, starting after the cursor id.
+
+        Returns {"chores": [...], "next_cursor": id or None}. Without cursor or
+        limit this is the whole (projected) catalog and is encoded once per
+        version; keyset pages are small and encoded per request.
+        """
+        snapshot = self._current()
+        if cursor is None and limit is None:
+            if fields is None:
+                return self._list_body(snapshot)
+            name = "fields:" + ",".join(fields)
+            body = snapshot.named_bodies.get(name)
+            if body is None:
+                body = snapshot.named_bodies[name] = encode_body(
+                    {"chores": project(snapshot.chores, fields)}
+                )
+            return body
+
+        limit = min(limit or MAX_PAGE_SIZE, MAX_PAGE_SIZE)
+        start = bisect.bisect_right(snapshot.sorted_ids, cursor) if cursor else 0
+        ids = snapshot.sorted_ids[start : start + limit]
+        more = start + limit < len(snapshot.sorted_ids)
+        return encode_body(
+            {
+                "chores": project([snapshot.by_id[i] for i in ids], fields),
+                "next_cursor": ids[-1] if ids and more else None,
+            }
+        )
+
+    def chore_body(self, chore_id: str) -> Optional[EncodedBody]:
+        """The encoded response for one chore, or None if it does not exist."""
+        snapshot = self._current()
+        body = snapshot.chore_bodies.get(chore_id)
+        if body is None:
+            chore = snapshot.by_id.get(chore_id)
+            if chore is None:
+                return None
+            body = snapshot.chore_bodies[chore_id] = encode_body(chore)
+        return body
+
+    def named_body(
+        self, name: str, build: Callable[[List[Dict]], object]
+    ) -> EncodedBody:
+        """Encode build(chores) once per catalog version and reuse it (e.g. /health)."""
+        snapshot = self._current()
+        body = snapshot.named_bodies.get(name)
+        if body is None:
+            body = snapshot.named_bodies[name] = encode_body(build(snapshot.chores))
+        return body
+
+    def __len__(self) -> int:
+        return len(self._current().chores)
+
+
+# Global instance
+chore_catalog = ChoreCatalog()
@@ -1,27 +1,183 @@
 import sqlite3
 import json
-from typing import List, Dict, Optional
+import re
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Sequence
 import os
-from functools import lru_cache
 
-DATABASE_PATH = os.path.join(os.path.dirname(__file__), "chores.db")
+DATABASE_PATH = os.getenv(
+    "CHORES_DB_PATH", os.path.join(os.path.dirname(__file__), "chores.db")
+)
+
+# SQLite tuning: memory-mapped reads and a larger page cache per connection
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(64 * 1024 * 1024)))
+SQLITE_CACHE_KB = int(os.getenv("SQLITE_CACHE_KB", "8192"))
+SQLITE_STATEMENT_CACHE = 128
+
+# Full-text index over title, items and steps
+SEARCH_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+SEARCH_LIMIT = 50
+FTS_ITEMS = """(SELECT group_concat(name, ', ') FROM (
+    SELECT i.name FROM chore_items ci JOIN items i ON i.id = ci.item_id
+    WHERE ci.chore_id = c.id ORDER BY ci.position))"""
+FTS_STEPS = """(SELECT group_concat(text, '. ') FROM (
+    SELECT text FROM chore_steps WHERE chore_id = c.id ORDER BY position))"""
+# Column weights for bm25(): title matches count most, then items, then steps
+SEARCH_CHORES = """
+    SELECT c.id,
+           highlight(chores_fts, 0, '<mark>', '</mark>'),
+           snippet(chores_fts, -1, '<mark>', '</mark>', '…', 12)
+    FROM chores_fts JOIN chores c ON c.rowid = chores_fts.rowid
+    WHERE chores_fts MATCH ?
+    ORDER BY bm25(chores_fts, 10.0, 4.0, 1.0)
+    LIMIT ?
+"""
+# Chores whose full-text row is missing or differs from their current text
+STALE_FTS_ROWS = f"""
+    SELECT c.rowid FROM chores c LEFT JOIN chores_fts f ON f.rowid = c.rowid
+    WHERE f.rowid IS NULL
+       OR f.title IS NOT c.title
+       OR f.items IS NOT {FTS_ITEMS}
+       OR f.steps IS NOT {FTS_STEPS}
+"""
+# WHERE clauses on chores for item-based lookups (lists are passed as JSON)
+CHORES_WITH_ITEM = """WHERE id IN (
+    SELECT ci.chore_id FROM chore_items ci JOIN items i ON i.id = ci.item_id
+    WHERE i.name = ? COLLATE NOCASE)"""
+CHORES_DOABLE_WITH = """WHERE NOT EXISTS (
+    SELECT 1 FROM chore_items ci JOIN items i ON i.id = ci.item_id
+    WHERE ci.chore_id = chores.id
+      AND i.name COLLATE NOCASE NOT IN (SELECT value FROM json_each(?)))"""
+CHORES_WITH_IDS = "WHERE id IN (SELECT value FROM json_each(?))"
+CHORES_AFTER_ID = "WHERE id IN (SELECT id FROM chores WHERE id > ? ORDER BY id LIMIT ?)"
+
+# Rows per transaction for bulk imports and per query for exports
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "5000"))
+
+
+class ConnectionPool:
+    """Thread-local read connections plus a single serialized writer.
+
+    All connections use WAL journaling, so readers never block on the writer
+    and each thread reuses its own connection (and its prepared statements).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._writer = None
+        self._write_lock = threading.RLock()
+        self._monitor = None
+        self._monitor_lock = threading.Lock()
+        # Bumped after every commit made through this pool
+        self.write_generation = 0
+        self._connections = []
+        self._connections_lock = threading.Lock()
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            check_same_thread=False,
+            cached_statements=SQLITE_STATEMENT_CACHE,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        conn.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_KB}")
+        conn.execute("PRAGMA foreign_keys=ON")
+        if read_only:
+            conn.execute("PRAGMA query_only=ON")
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    def reader(self) -> sqlite3.Connection:
+        """This thread's read connection (created on first use)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect(read_only=True)
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def writer(self):
+        """Exclusive access to the writer connection; commits on success."""
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = self._connect()
+            try:
+                yield self._writer
+                self._writer.commit()
+                self.write_generation += 1
+            except Exception:
+                self._writer.rollback()
+                raise
+
+    def data_version(self) -> int:
+        """PRAGMA data_version of a dedicated connection.
+
+        The value changes whenever another connection (in this process or any
+        other, e.g. manage_db.py) commits to the database.
+        """
+        with self._monitor_lock:
+            if self._monitor is None:
+                self._monitor = self._connect(read_only=True)
+            return self._monitor.execute("PRAGMA data_version").fetchone()[0]
+
+    def close_all(self):
+        with self._connections_lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._connections = []
+        self._local = threading.local()
+        self._writer = None
+        self._monitor = None
+
+
+_pool = ConnectionPool(DATABASE_PATH)
+
+
+def get_db_connection() -> sqlite3.Connection:
+    """Get this thread's pooled read connection."""
+    return _pool.reader()
 
-# Connection pool to reuse database connections
-_db_connection = None
 
+def get_write_generation() -> int:
+    """Number of writes committed by this process (no database access)."""
+    return _pool.write_generation
 
-def get_db_connection():
-    """Get a reusable database connection."""
-    global _db_connection
-    if _db_connection is None:
-        _db_connection = sqlite3.connect(DATABASE_PATH, check_same_thread=False)
-    return _db_connection
+
+def get_data_version() -> tuple:
+    """Change marker for the chores data; differs after any committed write."""
+    return (_pool.write_generation, _pool.data_version())
 
 
 def init_database():
     """Initialize the database and create tables if they don't exist."""
-    conn = sqlite3.connect(DATABASE_PATH)
+    with _pool.writer() as conn:
+        _init_schema(conn)
+
+
+def _init_schema(conn: sqlite3.Connection):
     cursor = conn.cursor()
+    # Schema changes and the data migration commit (or roll back) together
+    if not conn.in_transaction:
+        cursor.execute("BEGIN")
+
+    # Databases created before normalization keep items/steps as JSON columns
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(chores)")]
+    legacy_rows = []
+    if "items" in columns:
+        legacy_rows = cursor.execute(
+            "SELECT id, title, items, steps, time_min FROM chores ORDER BY rowid"
+        ).fetchall()
+        cursor.execute("DROP TABLE chores")
 
     # Create chores table
     cursor.execute(
@@ -29,13 +185,62 @@ def init_database():
         CREATE TABLE IF NOT EXISTS chores (
             id TEXT PRIMARY KEY,
             title TEXT NOT NULL,
-            items TEXT,  -- JSON array of items
-            steps TEXT,  -- JSON array of steps
             time_min INTEGER
         )
     """
     )
 
+    # Item dictionary plus the ordered items and steps of each chore
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS items (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL COLLATE NOCASE UNIQUE
+        )
+    """
+    )
+    _merge_item_case_variants(cursor)
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS chore_items (
+            chore_id TEXT NOT NULL REFERENCES chores (id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            item_id INTEGER NOT NULL REFERENCES items (id),
+            PRIMARY KEY (chore_id, position)
+        ) WITHOUT ROWID
+    """
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS chore_items_item ON chore_items (item_id, chore_id)"
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS chore_steps (
+            chore_id TEXT NOT NULL REFERENCES chores (id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            text TEXT NOT NULL,
+            PRIMARY KEY (chore_id, position)
+        ) WITHOUT ROWID
+    """
+    )
+
+    if legacy_rows:
+        # Rowid order is preserved, so listings keep their original order
+        for chore_id, title, items, steps, time_min in legacy_rows:
+            cursor.execute(
+                "INSERT INTO chores (id, title, time_min) VALUES (?, ?, ?)",
+                (chore_id, title, time_min),
+            )
+            _write_children(
+                conn,
+                chore_id,
+                json.loads(items) if items else [],
+                json.loads(steps) if steps else [],
+            )
+        print(f"Migrated {len(legacy_rows)} chores to the normalized schema")
+
+    _init_search_index(cursor, rebuild=bool(legacy_rows))
+
     # Check if we need to populate with initial data
     cursor.execute("SELECT COUNT(*) FROM chores")
     count = cursor.fetchone()[0]
@@ -72,126 +277,385 @@ def init_database():
         ]
 
         for chore in initial_chores:
-            cursor.execute(
-                """
-                INSERT INTO chores (id, title, items, steps, time_min)
-                VALUES (?, ?, ?, ?, ?)
-            """,
-                (
-                    chore["id"],
-                    chore["title"],
-                    json.dumps(chore["items"]),
-                    json.dumps(chore["steps"]),
-                    chore["time_min"],
-                ),
+            _insert_chore(conn, chore)
+
+
+def _merge_item_case_variants(cursor: sqlite3.Cursor):
+    """Make item names unique regardless of case in older databases.
+
+    items.name used to be unique only case-sensitively, so "Sponge" and
+    "sponge" could be separate items. Each group of case variants is merged
+    into its oldest item, and a unique NOCASE index keeps it that way (the
+    column collation itself cannot be changed in place).
+    """
+    table_sql = cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'items'"
+    ).fetchone()[0]
+    index_sql = cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'index' AND name = 'items_name_nocase'"
+    ).fetchone()
+    if "NOCASE" in table_sql.upper() or (index_sql and "UNIQUE" in index_sql[0].upper()):
+        return
+
+    cursor.execute(
+        """
+        UPDATE chore_items SET item_id = (
+            SELECT MIN(v.id) FROM items i JOIN items v ON v.name = i.name COLLATE NOCASE
+            WHERE i.id = chore_items.item_id)
+    """
+    )
+    cursor.execute(
+        "DELETE FROM items WHERE id NOT IN "
+        "(SELECT MIN(id) FROM items GROUP BY name COLLATE NOCASE)"
+    )
+    cursor.execute("DROP INDEX IF EXISTS items_name_nocase")
+    cursor.execute(
+        "CREATE UNIQUE INDEX items_name_nocase ON items (name COLLATE NOCASE)"
+    )
+
+
+def _init_search_index(cursor: sqlite3.Cursor, rebuild: bool = False):
+    """Create the FTS5 table and bring it up to date without scanning it.
+
+    A new (or migrated) index is filled from scratch; otherwise only chores
+    appended past the last indexed rowid are added. Writes through this
+    module re-index the chores they touch (see _index_chores) and a trigger
+    removes index rows for deleted chores. reindex_search() does the full
+    check for rows edited some other way.
+    """
+    created = not cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'chores_fts'"
+    ).fetchone()
+    try:
+        cursor.execute(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS chores_fts USING fts5(
+                title, items, steps,
+                tokenize = 'porter unicode61 remove_diacritics 2',
+                prefix = '2 3'
             )
+        """
+        )
+    except sqlite3.OperationalError as e:
+        print(f"Full-text search unavailable, using LIKE search: {e}")
+        return
 
-    conn.commit()
-    conn.close()
+    # Insert/update triggers from the JSON-column schema are gone with that table
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS chores_fts_delete AFTER DELETE ON chores BEGIN
+            DELETE FROM chores_fts WHERE rowid = old.rowid;
+        END
+    """
+    )
 
+    if rebuild or created:
+        cursor.execute("DELETE FROM chores_fts")
+        cursor.execute(
+            "INSERT INTO chores_fts (rowid, title, items, steps) "
+            f"SELECT c.rowid, c.title, {FTS_ITEMS}, {FTS_STEPS} FROM chores c"
+        )
+        return
 
-@lru_cache(maxsize=1)
-def get_all_chores_cached() -> tuple:
-    """Get all chores with caching (returns tuple for hashability)."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    # Chores appended without going through this module (e.g. plain SQL)
+    last = cursor.execute(
+        "SELECT rowid FROM chores_fts ORDER BY rowid DESC LIMIT 1"
+    ).fetchone()
+    _index_chores(cursor.connection, "WHERE rowid > ?", (last[0] if last else 0,))
+
+
+def reindex_search() -> int:
+    """Re-index every chore whose full-text row is missing or out of date.
+
+    Scans the whole catalog, so it runs on demand (manage_db.py reindex), e.g.
+    after chores were edited with plain SQL. Returns the number re-indexed.
+    """
+    with _pool.writer() as conn:
+        has_fts = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'chores_fts'"
+        ).fetchone()
+        if not has_fts:
+            return 0
+        conn.execute(
+            "DELETE FROM chores_fts WHERE rowid NOT IN (SELECT rowid FROM chores)"
+        )
+        stale = [row[0] for row in conn.execute(STALE_FTS_ROWS)]
+        if stale:
+            _index_chores(
+                conn,
+                "WHERE rowid IN (SELECT value FROM json_each(?))",
+                (json.dumps(stale),),
+            )
+        return len(stale)
+
+
+def _index_chores(conn: sqlite3.Connection, where: str, params: Sequence = ()):
+    """Refresh the full-text rows of the chores matching where."""
+    has_fts = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'chores_fts'"
+    ).fetchone()
+    if not has_fts:
+        return
+    conn.execute(
+        f"DELETE FROM chores_fts WHERE rowid IN (SELECT rowid FROM chores {where})",
+        params,
+    )
+    conn.execute(
+        "INSERT INTO chores_fts (rowid, title, items, steps) "
+        f"SELECT c.rowid, c.title, {FTS_ITEMS}, {FTS_STEPS} FROM chores c {where}",
+        params,
+    )
+
+
+def _item_ids(conn: sqlite3.Connection, names: Iterable[str]) -> Dict[str, int]:
+    """Dictionary ids for item names (keyed as given), adding any that are new."""
+    names = list(dict.fromkeys(names))
+    # Names differing only in case are one item ("Sponge" == "sponge")
+    conn.executemany(
+        "INSERT INTO items (name) VALUES (?) ON CONFLICT DO NOTHING",
+        [(name,) for name in names],
+    )
+    rows = conn.execute(
+        """
+        SELECT value, (SELECT id FROM items WHERE name = value COLLATE NOCASE)
+        FROM json_each(?)
+    """,
+        (json.dumps(names),),
+    ).fetchall()
+    return dict(rows)
+
+
+def _write_children(
+    conn: sqlite3.Connection, chore_id: str, items: List[str], steps: List[str]
+):
+    """Replace the items and steps of one chore."""
+    conn.execute("DELETE FROM chore_items WHERE chore_id = ?", (chore_id,))
+    conn.execute("DELETE FROM chore_steps WHERE chore_id = ?", (chore_id,))
+    item_ids = _item_ids(conn, items)
+    conn.executemany(
+        "INSERT INTO chore_items (chore_id, position, item_id) VALUES (?, ?, ?)",
+        [(chore_id, pos, item_ids[name]) for pos, name in enumerate(items)],
+    )
+    conn.executemany(
+        "INSERT INTO chore_steps (chore_id, position, text) VALUES (?, ?, ?)",
+        [(chore_id, pos, text) for pos, text in enumerate(steps)],
+    )
+
+
+def _insert_chore(conn: sqlite3.Connection, chore: Dict):
+    conn.execute(
+        "INSERT INTO chores (id, title, time_min) VALUES (?, ?, ?)",
+        (chore["id"], chore["title"], chore.get("time_min", 0)),
+    )
+    _write_children(conn, chore["id"], chore.get("items", []), chore.get("steps", []))
+    _index_chores(conn, "WHERE id = ?", (chore["id"],))
 
-    cursor.execute("SELECT id, title, items, steps, time_min FROM chores")
-    rows = cursor.fetchall()
 
-    chores = []
-    for row in rows:
-        chore = {
+def _load_chores(
+    conn: sqlite3.Connection, where: str = "", params: Sequence = ()
+) -> List[Dict]:
+    """Assemble the chores matching where (a WHERE clause on chores), in rowid order."""
+    chores = {
+        row[0]: {
             "id": row[0],
             "title": row[1],
-            "items": json.loads(row[2]) if row[2] else [],
-            "steps": json.loads(row[3]) if row[3] else [],
-            "time_min": row[4],
+            "items": [],
+            "steps": [],
+            "time_min": row[2],
         }
-        chores.append(chore)
-
-    return tuple(json.dumps(c) for c in chores)
+        for row in conn.execute(
+            f"SELECT id, title, time_min FROM chores {where} ORDER BY rowid", params
+        )
+    }
+    if not chores:
+        return []
+
+    scope = f"WHERE chore_id IN (SELECT id FROM chores {where})" if where else ""
+    for chore_id, name in conn.execute(
+        "SELECT ci.chore_id, i.name FROM chore_items ci "
+        f"JOIN items i ON i.id = ci.item_id {scope} ORDER BY ci.chore_id, ci.position",
+        params,
+    ):
+        chores[chore_id]["items"].append(name)
+    for chore_id, text in conn.execute(
+        f"SELECT chore_id, text FROM chore_steps {scope} ORDER BY chore_id, position",
+        params,
+    ):
+        chores[chore_id]["steps"].append(text)
+    return list(chores.values())
+
+
+def _load_chores_by_ids(conn: sqlite3.Connection, ids: List[str]) -> List[Dict]:
+    """Chores for the given ids, in the order given (unknown ids are skipped)."""
+    by_id = {
+        chore["id"]: chore
+        for chore in _load_chores(conn, CHORES_WITH_IDS, (json.dumps(ids),))
+    }
+    return [by_id[chore_id] for chore_id in ids if chore_id in by_id]
 
 
 def get_all_chores() -> List[Dict]:
-    """Get all chores from the database with caching."""
-    cached = get_all_chores_cached()
-    return [json.loads(c) for c in cached]
+    """Get all chores from the database."""
+    return _load_chores(get_db_connection())
 
 
 def get_chore_by_id(chore_id: str) -> Optional[Dict]:
     """Get a specific chore by ID."""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
+    chores = _load_chores(get_db_connection(), "WHERE id = ?", (chore_id,))
+    return chores[0] if chores else None
 
-    cursor.execute(
-        "SELECT id, title, items, steps, time_min FROM chores WHERE id = ?", (chore_id,)
-    )
-    row = cursor.fetchone()
 
-    if row:
-        chore = {
-            "id": row[0],
-            "title": row[1],
-            "items": json.loads(row[2]) if row[2] else [],
-            "steps": json.loads(row[3]) if row[3] else [],
-            "time_min": row[4],
-        }
-        conn.close()
-        return chore
+def get_chores_by_item(item: str) -> List[Dict]:
+    """Chores that need the given item (case-insensitive)."""
+    return _load_chores(get_db_connection(), CHORES_WITH_ITEM, (item.strip(),))
 
-    conn.close()
-    return None
 
+def get_chores_doable_with(available: List[str]) -> List[Dict]:
+    """Chores whose items are all among the available ones (case-insensitive)."""
+    names = [name.strip() for name in available if name.strip()]
+    return _load_chores(get_db_connection(), CHORES_DOABLE_WITH, (json.dumps(names),))
 
-def search_chores(query: str) -> List[Dict]:
-    """Search chores by title."""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
 
-    cursor.execute(
-        "SELECT id, title, items, steps, time_min FROM chores WHERE title LIKE ?",
-        (f"%{query}%",),
-    )
-    rows = cursor.fetchall()
+def list_items() -> List[Dict]:
+    """Every item used by at least one chore, most used first."""
+    rows = get_db_connection().execute(
+        """
+        SELECT i.name, COUNT(DISTINCT ci.chore_id) AS chores
+        FROM items i JOIN chore_items ci ON ci.item_id = i.id
+        GROUP BY i.id
+        ORDER BY chores DESC, i.name
+    """
+    ).fetchall()
+    return [{"name": name, "chores": count} for name, count in rows]
 
-    chores = []
-    for row in rows:
-        chore = {
-            "id": row[0],
-            "title": row[1],
-            "items": json.loads(row[2]) if row[2] else [],
-            "steps": json.loads(row[3]) if row[3] else [],
-            "time_min": row[4],
-        }
-        chores.append(chore)
 
-    conn.close()
-    return chores
+def _fts_query(query: str) -> str:
+    """Turn free text into an FTS5 query: every word must match as a prefix."""
+    return " ".join(f'"{token}"*' for token in SEARCH_TOKEN_RE.findall(query))
 
 
-def add_chore(chore_data: Dict) -> bool:
-    """Add a new chore to the database."""
-    try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
+def search_chores(query: str, limit: int = SEARCH_LIMIT) -> List[Dict]:
+    """Full-text search over title, items and steps, best matches first.
 
-        cursor.execute(
+    Each result carries a "match" dict with the highlighted title and a
+    snippet of the best matching text.
+    """
+    match = _fts_query(query)
+    if not match:
+        return []
+
+    conn = get_db_connection()
+    try:
+        rows = conn.execute(SEARCH_CHORES, (match, limit)).fetchall()
+    except sqlite3.OperationalError:
+        # No FTS5 index (SQLite without FTS5)
+        pattern = f"%{query}%"
+        rows = conn.execute(
             """
-            INSERT INTO chores (id, title, items, steps, time_min)
-            VALUES (?, ?, ?, ?, ?)
+            SELECT id FROM chores c WHERE title LIKE ?
+               OR EXISTS (SELECT 1 FROM chore_items ci JOIN items i ON i.id = ci.item_id
+                          WHERE ci.chore_id = c.id AND i.name LIKE ?)
+               OR EXISTS (SELECT 1 FROM chore_steps s
+                          WHERE s.chore_id = c.id AND s.text LIKE ?)
+            LIMIT ?
         """,
-            (
-                chore_data["id"],
-                chore_data["title"],
-                json.dumps(chore_data.get("items", [])),
-                json.dumps(chore_data.get("steps", [])),
-                chore_data.get("time_min", 0),
-            ),
+            (pattern, pattern, pattern, limit),
+        ).fetchall()
+        return _load_chores_by_ids(conn, [row[0] for row in rows])
+
+    results = _load_chores_by_ids(conn, [row[0] for row in rows])
+    for chore, row in zip(results, rows):
+        chore["match"] = {"title": row[1], "snippet": row[2]}
+    return results
+
+
+def _upsert_chunk(conn: sqlite3.Connection, chunk: List[Dict]):
+    """Insert or replace a chunk of chores with a handful of executemany calls."""
+    # Last occurrence wins if an id repeats within the chunk
+    chores = list({chore["id"]: chore for chore in chunk}.values())
+    ids = json.dumps([chore["id"] for chore in chores])
+
+    conn.executemany(
+        """
+        INSERT INTO chores (id, title, time_min) VALUES (?, ?, ?)
+        ON CONFLICT (id) DO UPDATE SET title = excluded.title, time_min = excluded.time_min
+    """,
+        [(c["id"], c["title"], c.get("time_min", 0)) for c in chores],
+    )
+    for table in ("chore_items", "chore_steps"):
+        conn.execute(
+            f"DELETE FROM {table} WHERE chore_id IN (SELECT value FROM json_each(?))",
+            (ids,),
         )
 
-        conn.commit()
-        conn.close()
+    item_ids = _item_ids(conn, (name for c in chores for name in c.get("items", [])))
+    conn.executemany(
+        "INSERT INTO chore_items (chore_id, position, item_id) VALUES (?, ?, ?)",
+        (
+            (c["id"], pos, item_ids[name])
+            for c in chores
+            for pos, name in enumerate(c.get("items", []))
+        ),
+    )
+    conn.executemany(
+        "INSERT INTO chore_steps (chore_id, position, text) VALUES (?, ?, ?)",
+        (
+            (c["id"], pos, text)
+            for c in chores
+            for pos, text in enumerate(c.get("steps", []))
+        ),
+    )
+    _index_chores(conn, CHORES_WITH_IDS, (ids,))
+
+
+def upsert_chores(
+    chores: Iterable[Dict],
+    chunk_size: int = BULK_CHUNK_SIZE,
+    progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """Insert or update chores from any iterable, one transaction per chunk.
+
+    The iterable is consumed lazily, so a generator over a huge file never
+    has more than one chunk in memory. Returns the number of records written.
+    """
+    written = 0
+    chunk: List[Dict] = []
+    for chore in chores:
+        chunk.append(chore)
+        if len(chunk) >= chunk_size:
+            with _pool.writer() as conn:
+                _upsert_chunk(conn, chunk)
+            written += len(chunk)
+            chunk = []
+            if progress:
+                progress(written)
+    if chunk:
+        with _pool.writer() as conn:
+            _upsert_chunk(conn, chunk)
+        written += len(chunk)
+        if progress:
+            progress(written)
+    return written
+
+
+def iter_chores(chunk_size: int = BULK_CHUNK_SIZE) -> Iterator[Dict]:
+    """Stream every chore in id order, loading one chunk at a time."""
+    conn = get_db_connection()
+    last_id = ""
+    while True:
+        chores = _load_chores(conn, CHORES_AFTER_ID, (last_id, chunk_size))
+        if not chores:
+            return
+        chores.sort(key=lambda chore: chore["id"])
+        yield from chores
+        last_id = chores[-1]["id"]
+
+
+def add_chore(chore_data: Dict) -> bool:
+    """Add a new chore to the database."""
+    try:
+        with _pool.writer() as conn:
+            _insert_chore(conn, chore_data)
         return True
     except Exception:
         return False
@@ -200,41 +664,34 @@ def add_chore(chore_data: Dict) -> bool:
 def update_chore(chore_id: str, chore_data: Dict) -> bool:
     """Update an existing chore."""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            UPDATE chores 
-            SET title = ?, items = ?, steps = ?, time_min = ?
-            WHERE id = ?
-        """,
-            (
-                chore_data["title"],
-                json.dumps(chore_data.get("items", [])),
-                json.dumps(chore_data.get("steps", [])),
-                chore_data.get("time_min", 0),
+        with _pool.writer() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE chores
+                SET title = ?, time_min = ?
+                WHERE id = ?
+            """,
+                (chore_data["title"], chore_data.get("time_min", 0), chore_id),
+            )
+            if cursor.rowcount == 0:
+                return False
+            _write_children(
+                conn,
                 chore_id,
-            ),
-        )
-
-        conn.commit()
-        conn.close()
-        return cursor.rowcount > 0
+                chore_data.get("items", []),
+                chore_data.get("steps", []),
+            )
+            _index_chores(conn, "WHERE id = ?", (chore_id,))
+        return True
     except Exception:
         return False
 
 
 def delete_chore(chore_id: str) -> bool:
-    """Delete a chore from the database."""
+    """Delete a chore (its items and steps cascade) from the database."""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-
-        cursor.execute("DELETE FROM chores WHERE id = ?", (chore_id,))
-
-        conn.commit()
-        conn.close()
+        with _pool.writer() as conn:
+            cursor = conn.execute("DELETE FROM chores WHERE id = ?", (chore_id,))
         return cursor.rowcount > 0
     except Exception:
         return False
@@ -1,17 +1,147 @@
+import asyncio
+import hashlib
 import json
 import os
+import threading
+import time
+import httpx
 import numpy as np
-from typing import List, Dict
-from groq import Groq
+from collections import OrderedDict
+from typing import AsyncIterator, Awaitable, Callable, List, Dict, Optional, Set, Tuple
+from groq import AsyncGroq
+from retrieval import EmbeddingIndex, KeywordIndex, default_embedder
 
 # Initialize Groq client
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
+GROQ_MODEL = "llama-3.1-8b-instant"
+GROQ_PARAMS = {"temperature": 0.7, "max_tokens": 200, "top_p": 0.9}
+GROQ_MAX_CONCURRENCY = int(os.getenv("GROQ_MAX_CONCURRENCY", "8"))
+
+# Bump whenever the prompt template changes so cached advice is not reused
+PROMPT_VERSION = "1"
+
+# "keyword" (BM25) or "semantic" (embedding matrix) knowledge retrieval
+RAG_RETRIEVAL = os.getenv("RAG_RETRIEVAL", "keyword").lower()
+KNOWLEDGE_EMBEDDINGS_DIR = os.getenv(
+    "KNOWLEDGE_EMBEDDINGS_DIR", os.path.join(os.path.dirname(__file__), "data")
+)
+
+ADVICE_CACHE_SIZE = int(os.getenv("ADVICE_CACHE_SIZE", "1024"))
+ADVICE_CACHE_TTL = float(os.getenv("ADVICE_CACHE_TTL", "3600"))
+ADVICE_CACHE_STALE_TTL = float(os.getenv("ADVICE_CACHE_STALE_TTL", "86400"))
+
+
+class AdviceCache:
+    """Bounded LRU of generated advice with TTL and stale-while-revalidate.
+
+    Entries are fresh for `ttl` seconds. After that they are still served for
+    up to `stale_ttl` more seconds while a single background refresh runs.
+    """
+
+    def __init__(
+        self,
+        max_size: int = ADVICE_CACHE_SIZE,
+        ttl: float = ADVICE_CACHE_TTL,
+        stale_ttl: float = ADVICE_CACHE_STALE_TTL,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(chore: Dict, user_context: str, model: str) -> str:
+        content = json.dumps(chore, sort_keys=True, ensure_ascii=False)
+        content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        # Normalize case and whitespace so trivially different contexts match
+        context = " ".join((user_context or "").lower().split())
+        payload = "\x1f".join(
+            [str(chore.get("id", "")), content_hash, context, model, PROMPT_VERSION]
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Tuple[Optional[str], str]:
+        """Return (advice, state) where state is "fresh", "stale" or "miss"."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, "miss"
+            advice, stored_at = entry
+            age = time.monotonic() - stored_at
+            if age > self.ttl + self.stale_ttl:
+                del self._entries[key]
+                return None, "miss"
+            self._entries.move_to_end(key)
+            return advice, "fresh" if age <= self.ttl else "stale"
+
+    def put(self, key: str, advice: str):
+        with self._lock:
+            self._entries[key] = (advice, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def begin_refresh(self, key: str) -> bool:
+        """Claim the refresh of a key; False if one is already running."""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def end_refresh(self, key: str, advice: Optional[str]):
+        if advice:
+            self.put(key, advice)
+        with self._lock:
+            self._refreshing.discard(key)
+
+    async def refresh_async(
+        self, key: str, generate: Callable[[], Awaitable[Optional[str]]]
+    ):
+        """Regenerate a stale entry on the event loop (at most once per key)."""
+        if not self.begin_refresh(key):
+            return
+        advice = None
+        try:
+            advice = await generate()
+        except Exception as e:
+            print(f"Advice refresh failed: {e}")
+        finally:
+            self.end_refresh(key, advice)
+
+
+class AdviceStreamError(Exception):
+    """The upstream stream failed after part of the advice was already sent"""
 
 
 class GroqRAG:
     def __init__(self):
-        self.client = Groq(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
+        self.async_client = None
+        if GROQ_API_KEY:
+            # Pooled keep-alive connections shared by every advice request
+            limits = httpx.Limits(
+                max_connections=GROQ_MAX_CONCURRENCY,
+                max_keepalive_connections=GROQ_MAX_CONCURRENCY,
+            )
+            self.async_client = AsyncGroq(
+                api_key=GROQ_API_KEY, http_client=httpx.AsyncClient(limits=limits)
+            )
+        # Caps concurrent upstream calls; identical prompts share one call
+        self._groq_slots = asyncio.Semaphore(GROQ_MAX_CONCURRENCY)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._background: Set[asyncio.Task] = set()
         self.knowledge_base = self._load_knowledge()
+        # Index once at load time; queries only touch their terms' postings
+        self.keyword_index = KeywordIndex(
+            [self._entry_text(entry) for entry in self.knowledge_base]
+        )
+        self.embedder = None
+        self.embedding_index = None
+        if RAG_RETRIEVAL == "semantic" and self.knowledge_base:
+            self._load_embeddings()
+        self.advice_cache = AdviceCache()
 
     def _load_knowledge(self) -> List[Dict]:
         """Load knowledge base from JSON file"""
@@ -30,51 +160,175 @@ class GroqRAG:
             print(f"Error loading knowledge base: {e}")
             return []
 
+    @staticmethod
+    def _entry_text(entry: Dict) -> str:
+        return f"{entry.get('category', '')} {entry.get('tip', '')} {entry.get('context', '')}"
+
     def _simple_search(self, query: str, top_k: int = 3) -> List[str]:
-        """Simple keyword-based search (no embeddings needed)"""
+        """BM25 keyword search over the knowledge base (no embeddings needed)"""
         if not self.knowledge_base:
             return []
 
-        query_lower = query.lower()
+        return [
+            self.knowledge_base[doc_id].get("tip", "")
+            for doc_id, _ in self.keyword_index.search(query, top_k)
+        ]
+
+    def _load_embeddings(self):
+        """Load (memory-mapped) or build the knowledge embedding matrix.
+
+        The file name carries a hash of the embedder and tip texts, so edits to
+        the knowledge base or a different model produce a fresh matrix.
+        """
+        self.embedder = default_embedder()
+        texts = [self._entry_text(entry) for entry in self.knowledge_base]
+        signature = hashlib.sha256(
+            "\x1f".join([self.embedder.name] + texts).encode("utf-8")
+        ).hexdigest()[:16]
+        path = os.path.join(
+            KNOWLEDGE_EMBEDDINGS_DIR, f"knowledge_embeddings-{signature}.npy"
+        )
+
+        try:
+            if os.path.exists(path):
+                self.embedding_index = EmbeddingIndex.load(path)
+                return
+            self.embedding_index = EmbeddingIndex.build(texts, self.embedder)
+            self.embedding_index.save(path)
+        except Exception as e:
+            print(f"Error loading knowledge embeddings: {e}")
+            if self.embedding_index is None:
+                self.embedder = None
 
-        # Score each knowledge entry
-        scored_entries = []
-        for entry in self.knowledge_base:
-            score = 0
-            entry_text = f"{entry.get('category', '')} {entry.get('tip', '')} {entry.get('context', '')}".lower()
+    def _semantic_search(self, query: str, top_k: int = 3) -> List[str]:
+        """Embedding search over the knowledge base"""
+        return self.search_many([query], top_k)[0]
 
-            # Simple keyword matching
-            query_words = query_lower.split()
-            for word in query_words:
-                if len(word) > 3:  # Skip short words
-                    score += entry_text.count(word)
+    def search_many(self, queries: List[str], top_k: int = 3) -> List[List[str]]:
+        """Retrieve tips for many queries at once (one matrix product)"""
+        if self.embedding_index is None:
+            return [self._simple_search(query, top_k) for query in queries]
+
+        results = self.embedding_index.search_many(self.embedder.embed(queries), top_k)
+        return [
+            [self.knowledge_base[doc_id].get("tip", "") for doc_id, _ in hits]
+            for hits in results
+        ]
 
-            if score > 0:
-                scored_entries.append((score, entry.get("tip", "")))
+    def _retrieve(self, query: str, top_k: int = 3) -> List[str]:
+        if self.embedding_index is not None:
+            return self._semantic_search(query, top_k)
+        return self._simple_search(query, top_k)
 
-        # Sort by score and return top_k
-        scored_entries.sort(reverse=True, key=lambda x: x[0])
-        return [tip for _, tip in scored_entries[:top_k]]
+    async def get_advice_async(self, chore: Dict, user_context: str = "") -> str:
+        """Get advice for a chore, served from the advice cache when possible"""
+        if not self.async_client:
+            return self._fallback_advice(chore)
+
+        key = AdviceCache.make_key(chore, user_context, GROQ_MODEL)
+        advice, state = self.advice_cache.get(key)
+        if state == "stale":
+            task = asyncio.create_task(
+                self.advice_cache.refresh_async(
+                    key, lambda: self._generate_advice_async(chore, user_context)
+                )
+            )
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+        if advice is not None:
+            return advice
 
-    def get_advice(self, chore: Dict, user_context: str = "") -> str:
-        """Generate advice using Groq API"""
-        if not self.client:
+        advice = await self._generate_advice_async(chore, user_context)
+        if advice is None:
             return self._fallback_advice(chore)
+        self.advice_cache.put(key, advice)
+        return advice
 
+    async def stream_advice(
+        self, chore: Dict, user_context: str = ""
+    ) -> AsyncIterator[str]:
+        """Yield advice text as Groq streams it (cached advice comes in one piece)"""
+        if not self.async_client:
+            yield self._fallback_advice(chore)
+            return
+
+        key = AdviceCache.make_key(chore, user_context, GROQ_MODEL)
+        advice, state = self.advice_cache.get(key)
+        if advice is not None:
+            if state == "stale":
+                task = asyncio.create_task(
+                    self.advice_cache.refresh_async(
+                        key, lambda: self._generate_advice_async(chore, user_context)
+                    )
+                )
+                self._background.add(task)
+                task.add_done_callback(self._background.discard)
+            yield advice
+            return
+
+        # Upstream chunks go through a queue so a Groq slot is held only while
+        # Groq is generating, not while a slow client reads. One chunk carries
+        # at least one token, so the pump never waits for the reader.
+        queue: asyncio.Queue = asyncio.Queue(maxsize=GROQ_PARAMS["max_tokens"] + 1)
+        pump = asyncio.create_task(self._pump_stream(chore, user_context, queue))
+        parts = []
         try:
-            # Get relevant knowledge
-            query = f"{chore.get('title', '')} {' '.join(chore.get('items', []))} {user_context}"
-            relevant_tips = self._simple_search(query, top_k=3)
-
-            # Build context
-            context = (
-                "\n".join([f"- {tip}" for tip in relevant_tips])
-                if relevant_tips
-                else "No specific tips available."
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    print(f"Groq API error: {item}")
+                    if not parts:
+                        yield self._fallback_advice(chore)
+                        return
+                    raise AdviceStreamError("Advice stream interrupted") from item
+                parts.append(item)
+                yield item
+        finally:
+            pump.cancel()
+
+        advice = "".join(parts).strip()
+        if advice:
+            self.advice_cache.put(key, advice)
+        else:
+            yield self._fallback_advice(chore)
+
+    async def _pump_stream(
+        self, chore: Dict, user_context: str, queue: asyncio.Queue
+    ):
+        """Copy a streamed completion into queue, ending with None or the error"""
+        try:
+            # Retrieval (possibly embedding the query) stays off the event loop
+            messages = await asyncio.to_thread(
+                self._build_messages, chore, user_context
             )
+            async with self._groq_slots:
+                stream = await self.async_client.chat.completions.create(
+                    model=GROQ_MODEL, messages=messages, stream=True, **GROQ_PARAMS
+                )
+                async for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        queue.put_nowait(delta)
+            queue.put_nowait(None)
+        except Exception as e:
+            queue.put_nowait(e)
 
-            # Create prompt
-            prompt = f"""You are a helpful household assistant. Give concise, practical advice for this chore.
+    def _build_messages(self, chore: Dict, user_context: str = "") -> List[Dict]:
+        # Get relevant knowledge
+        query = f"{chore.get('title', '')} {' '.join(chore.get('items', []))} {user_context}"
+        relevant_tips = self._retrieve(query, top_k=3)
+
+        # Build context
+        context = (
+            "\n".join([f"- {tip}" for tip in relevant_tips])
+            if relevant_tips
+            else "No specific tips available."
+        )
+
+        # Create prompt
+        prompt = f"""You are a helpful household assistant. Give concise, practical advice for this chore.
 
 Chore: {chore.get('title', 'Unknown')}
 Items needed: {', '.join(chore.get('items', []))}
@@ -86,26 +340,59 @@ Relevant tips:
 
 Provide 2-3 helpful tips in a friendly, encouraging tone. Keep it under 150 words."""
 
-            # Call Groq API
-            response = self.client.chat.completions.create(
-                model="llama-3.1-8b-instant",  # Fast & free
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a helpful household assistant that gives concise, practical advice.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.7,
-                max_tokens=200,
-                top_p=0.9,
-            )
-
-            return response.choices[0].message.content.strip()
+        return [
+            {
+                "role": "system",
+                "content": "You are a helpful household assistant that gives concise, practical advice.",
+            },
+            {"role": "user", "content": prompt},
+        ]
 
+    async def _generate_advice_async(
+        self, chore: Dict, user_context: str = ""
+    ) -> Optional[str]:
+        """Generate advice using the async Groq client (None on failure)"""
+        try:
+            # Same chore, context and model means the same prompt
+            prompt_key = AdviceCache.make_key(chore, user_context, GROQ_MODEL)
+            return await self._singleflight(prompt_key, chore, user_context)
         except Exception as e:
             print(f"Groq API error: {e}")
-            return self._fallback_advice(chore)
+            return None
+
+    async def _singleflight(
+        self, prompt_key: str, chore: Dict, user_context: str
+    ) -> str:
+        """Run one upstream call per distinct prompt; concurrent callers share it.
+
+        The call (retrieval included) runs in a detached task that owns the
+        result, and every caller awaits it through a shield, so a cancelled
+        caller (e.g. a disconnected client) never cancels the call for the others.
+        """
+        task = self._inflight.get(prompt_key)
+        if task is None:
+            task = asyncio.create_task(self._complete(chore, user_context))
+            self._inflight[prompt_key] = task
+            task.add_done_callback(
+                lambda done: self._finish_inflight(prompt_key, done)
+            )
+        return await asyncio.shield(task)
+
+    async def _complete(self, chore: Dict, user_context: str) -> str:
+        # Retrieval (possibly embedding the query) stays off the event loop
+        messages = await asyncio.to_thread(self._build_messages, chore, user_context)
+        async with self._groq_slots:
+            response = await self.async_client.chat.completions.create(
+                model=GROQ_MODEL, messages=messages, **GROQ_PARAMS
+            )
+        return response.choices[0].message.content.strip()
+
+    def _finish_inflight(self, prompt_key: str, task: asyncio.Task):
+        if self._inflight.get(prompt_key) is task:
+            del self._inflight[prompt_key]
+        if not task.cancelled():
+            # Mark the exception as retrieved when every caller has gone away
+            task.exception()
 
     def _fallback_advice(self, chore: Dict) -> str:
         """Fallback advice when Groq is unavailable"""
@@ -126,7 +413,7 @@ Provide 2-3 helpful tips in a friendly, encouraging tone. Keep it under 150 word
 
     def is_available(self) -> bool:
         """Check if Groq API is configured"""
-        return bool(GROQ_API_KEY and self.client)
+        return bool(GROQ_API_KEY and self.async_client)
 
 
 # Global instance
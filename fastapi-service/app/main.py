@@ -1,34 +1,69 @@
-from fastapi import FastAPI, HTTPException, Depends, Header
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response, JSONResponse
+from fastapi.responses import Response, JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
-import os, uuid, requests
-from database import init_database, get_all_chores, get_chore_by_id, search_chores
-from groq_rag import groq_rag
+from typing import AsyncIterator, List, Optional, Tuple
+import asyncio, json, os, re, threading, uuid, requests
+from database import (
+    SEARCH_LIMIT,
+    get_chores_by_item,
+    get_chores_doable_with,
+    init_database,
+    list_items,
+    search_chores,
+)
+from catalog import (
+    MAX_PAGE_SIZE,
+    chore_catalog,
+    encode_json,
+    encoded_response,
+    etag_matches,
+    parse_fields,
+    project,
+)
+from groq_rag import AdviceStreamError, groq_rag, GROQ_MODEL
+from tts_cache import tts_cache
+from tts_engine import (
+    TTS_ENGINE,
+    MAX_TTS_CHARS,
+    chore_script,
+    clip_chunks,
+    clip_key,
+    resolve_voice,
+)
+from tts_pool import tts_pool, PoolSaturated
+from tts_prerender import prerender_catalog
 
 app = FastAPI(title="Chore Coach API - Simple TTS + Groq RAG")
 
 # Initialize the database on startup
 init_database()
 
-# Preload chores into memory to make initial /chores responses faster
-CHORES_CACHE = []
-
 
 @app.on_event("startup")
 def preload_chores():
-    """Load chores into memory once at startup to serve quickly."""
-    global CHORES_CACHE
+    """Load the chore catalog into memory at startup to serve quickly."""
     try:
-        CHORES_CACHE = get_all_chores()
-    except Exception:
-        CHORES_CACHE = []
+        chore_catalog.refresh()
+    except Exception as e:
+        print(f"Error loading chore catalog: {e}")
+        return
+
+    if TTS_PRERENDER_ON_STARTUP and len(chore_catalog):
+        # Render catalog audio in the background so startup is not delayed
+        threading.Thread(
+            target=prerender_catalog, args=(chore_catalog.all(),), daemon=True
+        ).start()
 
 
 # --- env config ---
 INTERNAL_API_KEY = os.getenv("INTERNAL_API_KEY")
 CORS_ORIGIN = os.getenv("CORS_ORIGIN", "*")
+TTS_PRERENDER_ON_STARTUP = (
+    os.getenv("TTS_PRERENDER_ON_STARTUP", "false").lower() == "true"
+)
+MAX_TTS_BATCH = int(os.getenv("MAX_TTS_BATCH", "20"))
+CLIP_KEY_RE = re.compile(r"[0-9a-f]{64}")
 
 # Configure CORS
 allowed_origins = [
@@ -65,6 +100,14 @@ class TTSIn(BaseModel):
     similarity: float = 0.8
 
 
+class TTSBatchIn(BaseModel):
+    clips: List[TTSIn]
+
+
+class ChoreBatchIn(BaseModel):
+    ids: List[str]
+
+
 class AdviceRequest(BaseModel):
     chore_id: str
     user_context: Optional[str] = ""
@@ -80,50 +123,31 @@ def require_api_key(x_api_key: str = Header(default=None)):
 
 
 @app.get("/health")
-async def health_check():
+async def health_check(request: Request):
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "service": "chore-api-simple",
-        "chores_available": len(get_all_chores()),
-    }
+    body = chore_catalog.named_body(
+        "health",
+        lambda chores: {
+            "status": "healthy",
+            "service": "chore-api-simple",
+            "chores_available": len(chores),
+        },
+    )
+    return encoded_response(request, body, "no-cache")
 
 
 # --- helpers ---
-def chore_script(chore: dict) -> str:
-    items = ", ".join(chore.get("items") or [])
-    steps = chore.get("steps") or []
-    steps_txt = " ".join([f"Step {i+1}: {s}." for i, s in enumerate(steps)])
-    items_txt = f"You'll need: {items}. " if items else ""
-    return f'{chore["title"]}. Estimated time: {chore.get("time_min",0)} minutes. {items_txt}{steps_txt}'.strip()[
-        :1500
-    ]
-
-
-async def edge_tts_generate(text: str, voice: str = "en-US-AriaNeural") -> bytes:
-    """Generate TTS using Google Translate TTS"""
-    from gtts import gTTS
-    import io
+async def gtts_stream(text: str, voice: str) -> AsyncIterator[bytes]:
+    """Stream TTS audio, running the blocking gTTS calls on the synthesis pool.
 
+    A clip's segments are all synthesized inside one pool job, so the clip is
+    admitted (or rejected with PoolSaturated) once, before any audio is sent.
+    """
     try:
-        # Map voice preferences to languages
-        lang = "en"  # Default English
-        tld = "com"  # Top-level domain for accent
-
-        if "GB" in voice or "british" in voice.lower():
-            tld = "co.uk"  # British accent
-        elif "AU" in voice:
-            tld = "com.au"  # Australian accent
-
-        # Generate speech
-        tts = gTTS(text=text[:1500], lang=lang, tld=tld, slow=False)
-
-        # Save to bytes buffer
-        audio_buffer = io.BytesIO()
-        tts.write_to_fp(audio_buffer)
-        audio_buffer.seek(0)
-
-        return audio_buffer.read()
+        async for chunk in tts_pool.stream(lambda: clip_chunks(text, voice, tts_cache)):
+            yield chunk
+    except PoolSaturated:
+        raise
     except Exception as e:
         import traceback
 
@@ -133,82 +157,272 @@ async def edge_tts_generate(text: str, voice: str = "en-US-AriaNeural") -> bytes
         raise HTTPException(500, f"TTS generation failed: {str(e)}")
 
 
+def tts_text(payload: TTSIn) -> str:
+    """The text /tts speaks for a payload: free text, or the chore's script."""
+    if payload.text:
+        text = payload.text
+    else:
+        if not payload.chore_id:
+            raise HTTPException(400, "Provide chore_id or text")
+        chore = chore_catalog.get(payload.chore_id)
+        if not chore:
+            raise HTTPException(404, "Chore not found")
+        text = chore_script(chore)
+    return text[:MAX_TTS_CHARS]
+
+
+async def ensure_clip(key: str, text: str, voice: str) -> Tuple[int, str]:
+    """Make sure a clip is cached; returns (size in bytes, cache status)."""
+    cached = await tts_cache.lookup(key)
+    if cached is not None:
+        return len(cached), "HIT"
+
+    # Shares synthesis with any concurrent /tts request for the same clip
+    chunks, cache_status = await tts_cache.stream(key, lambda: gtts_stream(text, voice))
+    size = 0
+    async for chunk in chunks:
+        size += len(chunk)
+    return size, cache_status
+
+
 # --- routes ---
 @app.get("/chores")
-def list_chores(q: str = "", response: Response = None):
+def list_chores(
+    request: Request,
+    q: str = "",
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    fields: str = "",
+    response: Response = None,
+):
     """Return chores. If query provided, perform search; otherwise return
-    preloaded chores from memory.
+    the pre-encoded in-memory catalog, optionally paginated by id (cursor,
+    limit) and projected to a subset of fields (e.g. fields=id,title,time_min).
+
+    Searches return the best `limit` matches (SEARCH_LIMIT by default), with
+    "truncated": true when more chores matched. fields applies to search
+    results too; cursor does not (400).
     """
+    try:
+        projection = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
     if q:
+        if cursor:
+            raise HTTPException(400, "cursor is not supported with q")
         # For searches, fall back to DB search (lightweight)
-        res = search_chores(q.lower())
-        cache_status = "MISS"
-    else:
-        # Serve preloaded chores for fastest possible response
-        res = CHORES_CACHE
-        cache_status = "HIT"
+        if response:
+            response.headers["Cache-Control"] = "public, max-age=300"
+            response.headers["X-Cache-Status"] = "MISS"
+        # One extra row tells whether results were cut off at the limit
+        limit = limit or SEARCH_LIMIT
+        results = search_chores(q.lower(), limit + 1)
+        return {
+            "chores": project(results[:limit], projection),
+            "truncated": len(results) > limit,
+        }
 
-    if response:
-        # Small cache header for clients / CDNs
-        response.headers["Cache-Control"] = "public, max-age=300"
-        response.headers["X-Cache-Status"] = cache_status
-
-    return {"chores": res}
+    body = chore_catalog.page_body(cursor, limit, projection)
+    return encoded_response(request, body, "public, max-age=300")
 
 
 @app.get("/chores/static")
-def chores_static(response: Response = None):
-    """Explicit endpoint that serves the in-memory chores cache."""
-    if response:
-        response.headers["Cache-Control"] = "public, max-age=3600"
-        response.headers["X-Cache-Status"] = "HIT"
-
-    return {"chores": CHORES_CACHE}
+def chores_static(request: Request):
+    """Explicit endpoint that serves the in-memory chore catalog."""
+    return encoded_response(request, chore_catalog.list_body(), "public, max-age=3600")
 
 
 @app.get("/chores/{chore_id}")
-def get_chore(chore_id: str):
-    chore = get_chore_by_id(chore_id)
-    if chore:
-        return chore
+def get_chore(chore_id: str, request: Request):
+    body = chore_catalog.chore_body(chore_id)
+    if body:
+        return encoded_response(request, body, "public, max-age=300")
     raise HTTPException(404, "Chore not found")
 
 
+@app.post("/chores/batch")
+def get_chores_batch(payload: ChoreBatchIn):
+    """Resolve many chore ids at once; unknown ids are listed under "missing"."""
+    if len(payload.ids) > MAX_PAGE_SIZE:
+        raise HTTPException(400, f"At most {MAX_PAGE_SIZE} ids per request")
+    chores, missing = chore_catalog.get_many(payload.ids)
+    return Response(
+        content=encode_json({"chores": chores, "missing": missing}),
+        media_type="application/json",
+    )
+
+
+@app.get("/items")
+def items():
+    """Every item used by the catalog, with how many chores need it."""
+    return {"items": list_items()}
+
+
+@app.get("/items/doable")
+def doable_chores(have: str = ""):
+    """Chores that can be done with only the given items (comma separated)."""
+    return {"chores": get_chores_doable_with(have.split(","))}
+
+
+@app.get("/items/{item}/chores")
+def chores_for_item(item: str):
+    """Chores that need the given item."""
+    return {"item": item, "chores": get_chores_by_item(item)}
+
+
 @app.post("/tts")
 async def tts(payload: TTSIn, _=Depends(require_api_key)):
-    # Map voice_id to Edge TTS voices
-    voice_map = {
-        "21m00Tcm4TlvDq8ikWAM": "en-US-AriaNeural",
-        "default": "en-US-AriaNeural",
-        "male": "en-US-GuyNeural",
-        "female": "en-US-JennyNeural",
-        "british": "en-GB-SoniaNeural",
+    voice = resolve_voice(payload.voice_id)
+    text = tts_text(payload)
+    key = clip_key(text, voice)
+    cached = await tts_cache.lookup(key)
+    if cached is not None:
+        return Response(
+            cached, media_type="audio/mpeg", headers={"X-Cache-Status": "HIT"}
+        )
+
+    # Forward chunks as they are synthesized instead of buffering the clip
+    try:
+        chunks, cache_status = await tts_cache.stream(
+            key, lambda: gtts_stream(text, voice)
+        )
+    except PoolSaturated as e:
+        raise HTTPException(
+            503,
+            "TTS is busy, please retry shortly",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    return StreamingResponse(
+        chunks, media_type="audio/mpeg", headers={"X-Cache-Status": cache_status}
+    )
+
+
+@app.post("/tts/batch")
+async def tts_batch(payload: TTSBatchIn, _=Depends(require_api_key)):
+    """Synthesize several clips concurrently and return a manifest of clip URLs.
+
+    Identical clips in the batch are synthesized once. Each entry has either a
+    url to fetch from /tts/clips/{key} or an error with its status code.
+    """
+    if len(payload.clips) > MAX_TTS_BATCH:
+        raise HTTPException(400, f"At most {MAX_TTS_BATCH} clips per batch")
+
+    manifest = []
+    jobs = {}
+    for index, clip in enumerate(payload.clips):
+        try:
+            voice = resolve_voice(clip.voice_id)
+            text = tts_text(clip)
+        except HTTPException as e:
+            manifest.append(
+                {"index": index, "status": e.status_code, "error": e.detail}
+            )
+            continue
+        key = clip_key(text, voice)
+        jobs.setdefault(key, (text, voice))
+        manifest.append({"index": index, "key": key})
+
+    # One clip fewer than the pool has workers, so a batch never takes every
+    # worker and single /tts requests can still get one
+    slots = asyncio.Semaphore(max(1, tts_pool.max_workers - 1))
+
+    async def run(key: str, text: str, voice: str):
+        async with slots:
+            try:
+                size, cache_status = await ensure_clip(key, text, voice)
+                return {
+                    "url": f"/tts/clips/{key}",
+                    "bytes": size,
+                    "cache_status": cache_status,
+                }
+            except PoolSaturated as e:
+                return {
+                    "status": 503,
+                    "error": "TTS is busy",
+                    "retry_after": e.retry_after,
+                }
+            except HTTPException as e:
+                return {"status": e.status_code, "error": e.detail}
+
+    results = await asyncio.gather(*(run(key, *job) for key, job in jobs.items()))
+    by_key = dict(zip(jobs, results))
+    for entry in manifest:
+        if "key" in entry:
+            entry.update(by_key[entry["key"]])
+    return {"clips": manifest}
+
+
+@app.get("/tts/clips/{key}")
+async def tts_clip(key: str, request: Request, _=Depends(require_api_key)):
+    """Serve a cached clip by its content key (as listed by /tts/batch)."""
+    if not CLIP_KEY_RE.fullmatch(key):
+        raise HTTPException(404, "Clip not found")
+    # Clips are content-addressed, so the key itself is a strong validator
+    headers = {
+        "ETag": f'"{key}"',
+        "Cache-Control": "private, max-age=31536000, immutable",
     }
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
 
-    voice = voice_map.get(payload.voice_id, "en-US-AriaNeural")
+    data = await tts_cache.lookup(key)
+    if data is None:
+        raise HTTPException(404, "Clip not found")
+    return Response(data, media_type="audio/mpeg", headers=headers)
 
-    if payload.text:
-        audio = await edge_tts_generate(payload.text, voice)
-    else:
-        if not payload.chore_id:
-            raise HTTPException(400, "Provide chore_id or text")
-        chore = get_chore_by_id(payload.chore_id)
-        if not chore:
-            raise HTTPException(404, "Chore not found")
-        script = chore_script(chore)
-        audio = await edge_tts_generate(script, voice)
 
-    return Response(audio, media_type="audio/mpeg")
+@app.get("/tts/status")
+def tts_status():
+    """Synthesis pool load: concurrency, queue depth and queue wait times"""
+    return {"engine": TTS_ENGINE, "pool": tts_pool.metrics()}
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def advice_event_stream(chore: dict, user_context: str) -> StreamingResponse:
+    """Stream advice tokens as SSE; the final "done" event carries metadata.
+
+    If Groq fails after some tokens were sent, an "error" event ends the
+    stream instead of "done".
+    """
+
+    async def events():
+        try:
+            async for text in groq_rag.stream_advice(chore, user_context):
+                yield sse_event("token", {"text": text})
+        except AdviceStreamError as e:
+            # Tokens already sent cannot be taken back; tell the client it is partial
+            yield sse_event("error", {"chore_id": chore["id"], "message": str(e)})
+            return
+        yield sse_event(
+            "done",
+            {"chore_id": chore["id"], "rag_available": groq_rag.is_available()},
+        )
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.post("/advice")
-def get_advice(payload: AdviceRequest, _=Depends(require_api_key)):
-    """Get AI-powered advice using Groq"""
-    chore = get_chore_by_id(payload.chore_id)
+async def get_advice(
+    payload: AdviceRequest, stream: bool = False, _=Depends(require_api_key)
+):
+    """Get AI-powered advice using Groq (?stream=1 for Server-Sent Events)"""
+    chore = chore_catalog.get(payload.chore_id)
     if not chore:
         raise HTTPException(404, "Chore not found")
 
-    advice = groq_rag.get_advice(chore, payload.user_context)
+    if stream:
+        return advice_event_stream(chore, payload.user_context)
+
+    advice = await groq_rag.get_advice_async(chore, payload.user_context)
 
     return {
         "advice": advice,
@@ -217,11 +431,20 @@ def get_advice(payload: AdviceRequest, _=Depends(require_api_key)):
     }
 
 
+@app.post("/advice/stream")
+async def stream_advice(payload: AdviceRequest, _=Depends(require_api_key)):
+    """Stream AI-powered advice as Server-Sent Events"""
+    chore = chore_catalog.get(payload.chore_id)
+    if not chore:
+        raise HTTPException(404, "Chore not found")
+    return advice_event_stream(chore, payload.user_context)
+
+
 @app.get("/advice/status")
 def advice_status():
     """Check if advice generation is available"""
     return {
         "advice_available": groq_rag.is_available(),
         "service": "groq",
-        "model": "llama-3.1-8b-instant",
+        "model": GROQ_MODEL,
     }
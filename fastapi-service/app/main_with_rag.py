@@ -1,10 +1,26 @@
-from fastapi import FastAPI, HTTPException, Depends, Header
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response, JSONResponse
+from fastapi.responses import FileResponse, Response, JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
-import os, uuid, requests
-from database import init_database, get_all_chores, get_chore_by_id, search_chores
+from typing import AsyncIterator, List, Optional
+import asyncio, json, os, re, requests
+from database import (
+    SEARCH_LIMIT,
+    get_chores_by_item,
+    get_chores_doable_with,
+    init_database,
+    list_items,
+    search_chores,
+)
+from audio_store import AUDIO_STORE, LocalAudioStore, audio_object_key, audio_store
+from catalog import (
+    MAX_PAGE_SIZE,
+    chore_catalog,
+    encode_json,
+    encoded_response,
+    parse_fields,
+    project,
+)
 from rag.advice_generator import advice_generator
 
 app = FastAPI(title="Chore Coach API")
@@ -19,6 +35,10 @@ INTERNAL_API_KEY = os.getenv(
 ELEVEN_KEY = os.getenv("ELEVENLABS_API_KEY")
 BUCKET_NAME = os.getenv("BUCKET_NAME", "")
 STORE_TO_GCS = os.getenv("STORE_TO_GCS", "true").lower() == "true"
+AUDIO_NAME_RE = re.compile(r"[0-9a-f]{64}\.mp3")
+# Optional HTTP synthesis service used instead of Edge TTS (e.g. loadtest/fake_upstreams.py)
+TTS_UPSTREAM_URL = os.getenv("TTS_UPSTREAM_URL", "")
+TTS_ENGINE = "upstream" if TTS_UPSTREAM_URL else "edge-tts"
 CORS_ORIGIN = os.getenv("CORS_ORIGIN", "*")
 
 # Configure CORS to allow Vercel domains and local development
@@ -59,6 +79,10 @@ class TTSIn(BaseModel):
     similarity: float = 0.8
 
 
+class ChoreBatchIn(BaseModel):
+    ids: List[str]
+
+
 class AdviceRequest(BaseModel):
     chore_id: str
     user_context: Optional[str] = ""
@@ -76,13 +100,17 @@ def require_api_key(x_api_key: str = Header(default=None)):
 
 
 @app.get("/health")
-async def health_check():
+async def health_check(request: Request):
     """Health check endpoint to keep Cloud Run warm"""
-    return {
-        "status": "healthy",
-        "service": "chore-api",
-        "chores_available": len(get_all_chores()),
-    }
+    body = chore_catalog.named_body(
+        "health",
+        lambda chores: {
+            "status": "healthy",
+            "service": "chore-api",
+            "chores_available": len(chores),
+        },
+    )
+    return encoded_response(request, body, "no-cache")
 
 
 @app.get("/debug/env")
@@ -105,22 +133,35 @@ def chore_script(chore: dict) -> str:
     ]
 
 
-def upload_to_gcs_and_sign(data: bytes, content_type: str = "audio/mpeg") -> str:
-    from google.cloud import storage
+_tts_http = None
 
-    client = storage.Client()
-    bucket = client.bucket(BUCKET_NAME)
-    key = f"audio/{uuid.uuid4()}.mp3"
-    blob = bucket.blob(key)
-    blob.upload_from_string(data, content_type=content_type)
-    # 1-hour signed URL
-    return blob.generate_signed_url(version="v4", expiration=3600)
 
+async def upstream_tts_stream(text: str, voice: str) -> AsyncIterator[bytes]:
+    """Stream TTS audio from TTS_UPSTREAM_URL over one pooled HTTP client"""
+    global _tts_http
+    import httpx
+
+    if _tts_http is None:
+        _tts_http = httpx.AsyncClient(timeout=30)
+    try:
+        async with _tts_http.stream(
+            "POST", TTS_UPSTREAM_URL, json={"text": text[:1500], "voice": voice}
+        ) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                yield chunk
+    except httpx.HTTPError as e:
+        raise HTTPException(500, f"TTS generation failed: {str(e)}")
+
+
+async def edge_tts_stream(text: str, voice: str = "en-US-AriaNeural") -> AsyncIterator[bytes]:
+    """Stream TTS audio from Microsoft Edge TTS as each chunk arrives (completely free, no API key needed)"""
+    if TTS_UPSTREAM_URL:
+        async for chunk in upstream_tts_stream(text, voice):
+            yield chunk
+        return
 
-async def edge_tts_generate(text: str, voice: str = "en-US-AriaNeural") -> bytes:
-    """Generate TTS using Microsoft Edge TTS (completely free, no API key needed)"""
     import edge_tts
-    import tempfile
     
     # Available voices:
     # en-US-AriaNeural (Female, friendly)
@@ -130,50 +171,95 @@ async def edge_tts_generate(text: str, voice: str = "en-US-AriaNeural") -> bytes
     # Full list: https://speech.microsoft.com/portal/voicegallery
     
     try:
-        # Create temporary file for audio
-        with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as tmp_file:
-            tmp_path = tmp_file.name
-        
-        # Generate speech
         communicate = edge_tts.Communicate(text[:1500], voice)
-        await communicate.save(tmp_path)
-        
-        # Read the audio file
-        with open(tmp_path, "rb") as f:
-            audio_data = f.read()
-        
-        # Clean up
-        os.unlink(tmp_path)
-        
-        return audio_data
+        async for message in communicate.stream():
+            if message["type"] == "audio":
+                yield message["data"]
     except Exception as e:
         raise HTTPException(500, f"TTS generation failed: {str(e)}")
 
 
+async def edge_tts_generate(text: str, voice: str = "en-US-AriaNeural") -> bytes:
+    """Generate a whole clip in memory (needed when uploading to GCS)"""
+    return b"".join([chunk async for chunk in edge_tts_stream(text, voice)])
+
+
 # --- routes ---
 @app.get("/chores")
-def list_chores(q: str = "", response: Response = None):
-    if q:
-        res = search_chores(q.lower())
-    else:
-        res = get_all_chores()
-
-    # Add cache headers for client-side caching
-    if response:
-        response.headers["Cache-Control"] = "public, max-age=300"  # 5 minute cache
-        response.headers["X-Cache-Status"] = "HIT"
+def list_chores(
+    request: Request,
+    q: str = "",
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    fields: str = "",
+    response: Response = None,
+):
+    """Return chores: search results for q (best `limit` matches, SEARCH_LIMIT
+    by default, with "truncated": true when more matched), or the catalog.
+    fields applies to both; cursor only to the catalog (400 with q).
+    """
+    try:
+        projection = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
 
-    return {"chores": res}
+    if q:
+        if cursor:
+            raise HTTPException(400, "cursor is not supported with q")
+        # Add cache headers for client-side caching
+        if response:
+            response.headers["Cache-Control"] = "public, max-age=300"  # 5 minute cache
+            response.headers["X-Cache-Status"] = "MISS"
+        # One extra row tells whether results were cut off at the limit
+        limit = limit or SEARCH_LIMIT
+        results = search_chores(q.lower(), limit + 1)
+        return {
+            "chores": project(results[:limit], projection),
+            "truncated": len(results) > limit,
+        }
+
+    body = chore_catalog.page_body(cursor, limit, projection)
+    return encoded_response(request, body, "public, max-age=300")
 
 
 @app.get("/chores/{chore_id}")
-def get_chore(chore_id: str):
-    chore = get_chore_by_id(chore_id)
-    if chore:
-        return chore
+def get_chore(chore_id: str, request: Request):
+    body = chore_catalog.chore_body(chore_id)
+    if body:
+        return encoded_response(request, body, "public, max-age=300")
     raise HTTPException(404, "Chore not found")
 
 
+@app.post("/chores/batch")
+def get_chores_batch(payload: ChoreBatchIn):
+    """Resolve many chore ids at once; unknown ids are listed under "missing"."""
+    if len(payload.ids) > MAX_PAGE_SIZE:
+        raise HTTPException(400, f"At most {MAX_PAGE_SIZE} ids per request")
+    chores, missing = chore_catalog.get_many(payload.ids)
+    return Response(
+        content=encode_json({"chores": chores, "missing": missing}),
+        media_type="application/json",
+    )
+
+
+@app.get("/items")
+def items():
+    """Every item used by the catalog, with how many chores need it."""
+    return {"items": list_items()}
+
+
+@app.get("/items/doable")
+def doable_chores(have: str = ""):
+    """Chores that can be done with only the given items (comma separated)."""
+    return {"chores": get_chores_doable_with(have.split(","))}
+
+
+@app.get("/items/{item}/chores")
+def chores_for_item(item: str):
+    """Chores that need the given item."""
+    return {"item": item, "chores": get_chores_by_item(item)}
+
+
 @app.post("/tts")
 async def tts(payload: TTSIn, _=Depends(require_api_key)):
     # Map voice_id to Edge TTS voices (maintain compatibility with frontend)
@@ -189,34 +275,100 @@ async def tts(payload: TTSIn, _=Depends(require_api_key)):
     
     # If caller passed text, speak it directly (used for "congrats")
     if payload.text:
-        audio = await edge_tts_generate(payload.text, voice)
+        text = payload.text
     else:
         # Else read a chore by id
         if not payload.chore_id:
             raise HTTPException(400, "Provide chore_id or text")
-        chore = get_chore_by_id(payload.chore_id)
+        chore = chore_catalog.get(payload.chore_id)
         if not chore:
             raise HTTPException(404, "Chore not found")
-        script = chore_script(chore)
-        audio = await edge_tts_generate(script, voice)
+        text = chore_script(chore)
 
     if STORE_TO_GCS:
-        if not BUCKET_NAME:
+        if AUDIO_STORE == "gcs" and not BUCKET_NAME:
             raise HTTPException(500, "Missing BUCKET_NAME")
-        url = upload_to_gcs_and_sign(audio)
-        return JSONResponse({"audio_url": url, "bytes": len(audio)})
+        # Clips already in the store are neither synthesized nor uploaded again
+        key = audio_object_key(text[:1500], voice, TTS_ENGINE)
+        stored = await asyncio.to_thread(audio_store.cached_url, key)
+        if stored is None:
+            audio = await edge_tts_generate(text, voice)
+            stored = await asyncio.to_thread(audio_store.upload, key, audio)
+        url, size = stored
+        return JSONResponse({"audio_url": url, "bytes": size})
     else:
-        return Response(audio, media_type="audio/mpeg")
+        # Forward audio chunks as they are synthesized. The first chunk is pulled
+        # up front so synthesis errors still turn into a proper 500 response.
+        chunks = edge_tts_stream(text, voice)
+        first = await anext(chunks, b"")
+
+        async def body():
+            yield first
+            async for chunk in chunks:
+                yield chunk
+
+        return StreamingResponse(body(), media_type="audio/mpeg")
+
+
+@app.get("/audio/{name}")
+async def stored_audio(name: str):
+    """Serve clips from the local audio store (AUDIO_STORE=local only)."""
+    local = isinstance(audio_store, LocalAudioStore)
+    if not local or not AUDIO_NAME_RE.fullmatch(name):
+        raise HTTPException(404, "Audio not found")
+    path = audio_store.path(f"audio/{name}")
+    if not os.path.exists(path):
+        raise HTTPException(404, "Audio not found")
+    return FileResponse(
+        path,
+        media_type="audio/mpeg",
+        headers={"Cache-Control": "private, max-age=31536000, immutable"},
+    )
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def advice_event_stream(chore: dict, user_context: str) -> StreamingResponse:
+    """Stream advice tokens as SSE; the final "done" event carries metadata.
+
+    If the LLM fails after some tokens were sent, an "error" event ends the
+    stream instead of "done".
+    """
+    def events():
+        try:
+            for text in advice_generator.stream_chore_advice(chore, user_context):
+                yield sse_event("token", {"text": text})
+        except Exception as e:
+            # Tokens already sent cannot be taken back; tell the client it is partial
+            yield sse_event("error", {"chore_id": chore["id"], "message": str(e)})
+            return
+        yield sse_event("done", {
+            "chore_id": chore["id"],
+            "rag_available": advice_generator.is_available(),
+        })
+
+    # Sync generator: Starlette iterates it in a worker thread
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.post("/advice")
-def get_advice(payload: AdviceRequest, _=Depends(require_api_key)):
-    """Get AI-powered advice for a specific chore"""
-    chore = get_chore_by_id(payload.chore_id)
+async def get_advice(payload: AdviceRequest, stream: bool = False, _=Depends(require_api_key)):
+    """Get AI-powered advice for a specific chore (?stream=1 for Server-Sent Events)"""
+    chore = chore_catalog.get(payload.chore_id)
     if not chore:
         raise HTTPException(404, "Chore not found")
 
-    advice = advice_generator.get_chore_advice(chore, payload.user_context)
+    if stream:
+        return advice_event_stream(chore, payload.user_context)
+
+    advice = await advice_generator.get_chore_advice_async(chore, payload.user_context)
 
     return {
         "advice": advice,
@@ -225,6 +377,15 @@ def get_advice(payload: AdviceRequest, _=Depends(require_api_key)):
     }
 
 
+@app.post("/advice/stream")
+def stream_advice(payload: AdviceRequest, _=Depends(require_api_key)):
+    """Stream AI-powered advice as Server-Sent Events"""
+    chore = chore_catalog.get(payload.chore_id)
+    if not chore:
+        raise HTTPException(404, "Chore not found")
+    return advice_event_stream(chore, payload.user_context)
+
+
 @app.get("/advice/status")
 def advice_status():
     """Check if advice generation is available"""
@@ -5,6 +5,8 @@ Database management script to provide command-line interface to manage chores in
 
 import sys
 import json
+import time
+from typing import Dict, Iterator
 from database import (
     init_database,
     get_all_chores,
@@ -13,6 +15,9 @@ from database import (
     update_chore,
     delete_chore,
     search_chores,
+    iter_chores,
+    reindex_search,
+    upsert_chores,
 )
 
 
@@ -54,7 +59,7 @@ def show_chore(chore_id):
 
 
 def search_chores_cmd(query):
-    """Search for chores by title."""
+    """Search chores by title, items and steps."""
     chores = search_chores(query)
     if not chores:
         print(f"No chores found matching '{query}'.")
@@ -137,6 +142,103 @@ def delete_chore_cmd(chore_id):
         print("Deletion cancelled.")
 
 
+def prerender_tts_cmd(force=False):
+    """Render TTS audio for every chore and voice into the persistent store."""
+    from tts_prerender import prerender_catalog
+
+    chores = get_all_chores()
+    print(f"Pre-rendering TTS audio for {len(chores)} chores...")
+    stats = prerender_catalog(chores, force=force, verbose=True)
+    print(
+        f"Done in {stats['seconds']}s: {stats['rendered']} clips rendered, "
+        f"{stats['skipped']} chores unchanged, {stats['failed']} failed."
+    )
+
+
+def read_jsonl(path: str) -> Iterator[Dict]:
+    """Yield chore records from a JSON Lines file ("-" for stdin), skipping bad lines."""
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                if not record.get("id") or not record.get("title"):
+                    raise ValueError("id and title are required")
+                for field in ("items", "steps"):
+                    value = record.get(field) or []
+                    if not isinstance(value, list) or not all(
+                        isinstance(entry, str) for entry in value
+                    ):
+                        raise ValueError(f"{field} must be a list of strings")
+                chore = {
+                    "id": str(record["id"]),
+                    "title": record["title"],
+                    "items": record.get("items") or [],
+                    "steps": record.get("steps") or [],
+                    "time_min": int(record.get("time_min") or 0),
+                }
+            except (ValueError, TypeError, AttributeError) as e:
+                print(f"\nSkipping line {line_no}: {e}", file=sys.stderr)
+                continue
+            yield chore
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def _progress_reporter(verb: str, started: float):
+    """Progress callback printing running count and throughput to stderr."""
+
+    def report(count: int):
+        elapsed = time.perf_counter() - started
+        rate = count / elapsed if elapsed > 0 else 0.0
+        print(f"\r{count:,} chores {verb} ({rate:,.0f}/s)", end="", file=sys.stderr)
+
+    return report
+
+
+def import_cmd(path):
+    """Upsert chores from a JSON Lines file in chunked transactions."""
+    started = time.perf_counter()
+    count = upsert_chores(
+        read_jsonl(path), progress=_progress_reporter("imported", started)
+    )
+    print(file=sys.stderr)
+    print(f"Imported {count:,} chores in {time.perf_counter() - started:.2f}s.")
+
+
+def export_cmd(path=None):
+    """Write every chore as JSON Lines to a file (or stdout)."""
+    started = time.perf_counter()
+    progress = _progress_reporter("exported", started)
+    f = open(path, "w", encoding="utf-8") if path and path != "-" else sys.stdout
+    count = 0
+    try:
+        for chore in iter_chores():
+            f.write(json.dumps(chore, ensure_ascii=False))
+            f.write("\n")
+            count += 1
+            if count % 10000 == 0:
+                progress(count)
+    finally:
+        if f is not sys.stdout:
+            f.close()
+    progress(count)
+    print(file=sys.stderr)
+    elapsed = time.perf_counter() - started
+    print(f"Exported {count:,} chores in {elapsed:.2f}s.", file=sys.stderr)
+
+
+def reindex_cmd():
+    """Re-index chores whose search entry is missing or out of date."""
+    started = time.perf_counter()
+    count = reindex_search()
+    print(f"Re-indexed {count:,} chores in {time.perf_counter() - started:.2f}s.")
+
+
 def print_usage():
     """Print usage information."""
     print(
@@ -146,10 +248,14 @@ Usage: python manage_db.py <command> [arguments]
 Commands:
   list                 List all chores
   show <chore_id>      Show details of a specific chore
-  search <query>       Search chores by title
+  search <query>       Search chores by title, items and steps
   add                  Add a new chore interactively
   delete <chore_id>    Delete a chore
   init                 Initialize/reset database
+  prerender-tts [--force]  Render TTS audio for all chores (changed ones only)
+  import <file.jsonl>  Insert or update chores from JSON Lines ("-" for stdin)
+  export [file.jsonl]  Write all chores as JSON Lines (stdout by default)
+  reindex              Rebuild search entries for chores edited outside this tool
   
 Examples:
   python manage_db.py list
@@ -157,6 +263,10 @@ Examples:
   python manage_db.py search clean
   python manage_db.py add
   python manage_db.py delete old-chore
+  python manage_db.py prerender-tts
+  python manage_db.py import chores.jsonl
+  python manage_db.py export backup.jsonl
+  python manage_db.py reindex
 """
     )
 
@@ -194,6 +304,17 @@ def main():
         print("Initializing database...")
         init_database()
         print("Database initialized!")
+    elif command == "prerender-tts":
+        prerender_tts_cmd(force="--force" in sys.argv[2:])
+    elif command == "import":
+        if len(sys.argv) < 3:
+            print("Usage: python manage_db.py import <file.jsonl>")
+            return
+        import_cmd(sys.argv[2])
+    elif command == "export":
+        export_cmd(sys.argv[2] if len(sys.argv) > 2 else None)
+    elif command == "reindex":
+        reindex_cmd()
     else:
         print(f"Unknown command: {command}")
         print_usage()
@@ -0,0 +1,82 @@
+"""
+Minimal MPEG Layer III frame handling for joining separately encoded clips
+"""
+
+from typing import Optional
+
+# Layer III bitrates (kbps) by bitrate index, for MPEG-1 and MPEG-2/2.5
+_BITRATES = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Sample rates by version bits (3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5)
+_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    0: (11025, 12000, 8000),
+}
+_VBR_TAGS = (b"Xing", b"Info")
+
+
+def _id3v2_length(data: bytes) -> int:
+    """Bytes taken by a leading ID3v2 tag (0 if there is none)."""
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = 0
+    for byte in data[6:10]:
+        size = (size << 7) | (byte & 0x7F)  # syncsafe integer
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _frame_length(data: bytes, pos: int) -> Optional[int]:
+    """Length of the Layer III frame whose header starts at pos, or None."""
+    if pos + 4 > len(data) or data[pos] != 0xFF or data[pos + 1] & 0xE0 != 0xE0:
+        return None
+    version = (data[pos + 1] >> 3) & 3
+    layer = (data[pos + 1] >> 1) & 3
+    bitrate_index = data[pos + 2] >> 4
+    rate_index = (data[pos + 2] >> 2) & 3
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    bitrate = _BITRATES[1 if version == 3 else 2][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    padding = (data[pos + 2] >> 1) & 1
+    return (144 if version == 3 else 72) * bitrate // sample_rate + padding
+
+
+def _is_vbr_header(data: bytes, pos: int, length: int) -> bool:
+    """Whether the frame at pos is a Xing/Info or VBRI header, not audio."""
+    version = (data[pos + 1] >> 3) & 3
+    mono = data[pos + 3] >> 6 == 3
+    if version == 3:
+        offset = 21 if mono else 36
+    else:
+        offset = 13 if mono else 21
+    frame = data[pos : pos + length]
+    return frame[offset : offset + 4] in _VBR_TAGS or frame[36:40] == b"VBRI"
+
+
+def audio_frames(data: bytes) -> bytes:
+    """The audio frames of an MP3 clip, without ID3 tags or a VBR header frame.
+
+    A Xing/Info header describes the length of its own clip, so it has to go
+    before clips are concatenated. Data that does not parse as Layer III is
+    returned with only its tags removed.
+    """
+    start = _id3v2_length(data)
+    end = len(data)
+    if end - start >= 128 and data[end - 128 : end - 125] == b"TAG":
+        end -= 128  # ID3v1
+
+    pos = data.find(b"\xff", start, end)
+    while pos != -1 and _frame_length(data, pos) is None:
+        pos = data.find(b"\xff", pos + 1, end)
+    if pos == -1:
+        return data[start:end]
+
+    length = _frame_length(data, pos)
+    if _is_vbr_header(data, pos, length):
+        pos += length
+    return data[pos:end]
@@ -1,8 +1,9 @@
 """
 RAG-based advice generator
 """
+import asyncio
 import os
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, Tuple
 from .ollama_client import OllamaClient
 from .vector_store import VectorStore, initialize_knowledge_base
 
@@ -30,6 +31,46 @@ class AdviceGenerator:
         if not self.is_available():
             return self._get_fallback_advice(chore)
         
+        prompt, system_prompt = self._build_prompts(chore, user_context)
+        advice = self.ollama_client.generate(prompt, system_prompt)
+        
+        if advice:
+            return advice
+        else:
+            return self._get_fallback_advice(chore)
+    
+    async def get_chore_advice_async(self, chore: Dict[str, Any], user_context: str = "") -> Optional[str]:
+        """Async variant of get_chore_advice using the pooled async Ollama client"""
+        # A cold status check is a blocking HTTP request, so it runs on a thread too
+        if not await asyncio.to_thread(self.is_available):
+            return self._get_fallback_advice(chore)
+        
+        # Vector search is blocking (ChromaDB), so keep it off the event loop
+        prompt, system_prompt = await asyncio.to_thread(self._build_prompts, chore, user_context)
+        advice = await self.ollama_client.generate_async(prompt, system_prompt)
+        
+        if advice:
+            return advice
+        else:
+            return self._get_fallback_advice(chore)
+    
+    def stream_chore_advice(self, chore: Dict[str, Any], user_context: str = "") -> Iterator[str]:
+        """Yield advice tokens for a chore as the LLM generates them"""
+        if not self.is_available():
+            yield self._get_fallback_advice(chore)
+            return
+        
+        prompt, system_prompt = self._build_prompts(chore, user_context)
+        produced = False
+        for token in self.ollama_client.generate_stream(prompt, system_prompt):
+            produced = True
+            yield token
+        
+        if not produced:
+            yield self._get_fallback_advice(chore)
+    
+    def _build_prompts(self, chore: Dict[str, Any], user_context: str) -> Tuple[str, str]:
+        """Retrieve relevant tips and build the (prompt, system prompt) pair"""
         # Create search query
         chore_title = chore.get("title", "")
         chore_steps = " ".join(chore.get("steps", []))
@@ -56,12 +97,7 @@ class AdviceGenerator:
 Provide 2-3 practical tips that would be most helpful for this specific chore. Keep your response concise and encouraging.
 Use bullet points (•) for lists, not markdown formatting."""
 
-        advice = self.ollama_client.generate(prompt, system_prompt)
-        
-        if advice:
-            return advice
-        else:
-            return self._get_fallback_advice(chore)
+        return prompt, system_prompt
     
     def _build_context(self, chore: Dict[str, Any], relevant_docs: List[Dict[str, Any]], user_context: str) -> str:
         """Build context for LLM prompt"""
@@ -3,78 +3,230 @@ Ollama client for LLM interactions
 """
 import requests
 import json
-from typing import Optional, Dict, Any
+import threading
+import time
+from requests.adapters import HTTPAdapter
+from typing import Optional, Dict, Any, Iterator, List
 import os
 
+# How long a health / model-presence check stays valid before it is refreshed
+OLLAMA_STATUS_TTL = float(os.getenv("OLLAMA_STATUS_TTL", "30"))
+OLLAMA_POOL_SIZE = int(os.getenv("OLLAMA_POOL_SIZE", "10"))
+
 
 class OllamaClient:
     def __init__(self, base_url: str = None, model: str = None):
         self.base_url = base_url or os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
         self.model = model or os.getenv("OLLAMA_MODEL", "llama3.1:8b")
-        
-    def is_available(self) -> bool:
-        """Check if Ollama server is available"""
+
+        # Keep-alive connection pools shared by all requests
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=OLLAMA_POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._async_client = None
+
+        # Cached server health and model presence
+        self._lock = threading.Lock()
+        self._available: Optional[bool] = None
+        self._model_ready = False
+        self._checked_at = 0.0
+        self._refreshing = False
+
+    @property
+    def async_client(self):
+        """Lazily created httpx.AsyncClient (keep-alive pool for async callers)"""
+        if self._async_client is None:
+            import httpx
+            self._async_client = httpx.AsyncClient(
+                base_url=self.base_url,
+                limits=httpx.Limits(max_connections=OLLAMA_POOL_SIZE),
+                timeout=30,
+            )
+        return self._async_client
+
+    def _has_model(self, models: List[Dict[str, Any]]) -> bool:
+        for model in models:
+            if model["name"].startswith(self.model.split(":")[0]):
+                return True
+        return False
+
+    def refresh_status(self) -> bool:
+        """Query /api/tags once and update cached health and model presence"""
+        available, model_ready = False, False
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
-            return response.status_code == 200
-        except:
-            return False
-    
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=5)
+            if response.status_code == 200:
+                available = True
+                model_ready = self._has_model(response.json().get("models", []))
+        except Exception:
+            pass
+
+        with self._lock:
+            self._available = available
+            self._model_ready = model_ready
+            self._checked_at = time.monotonic()
+            self._refreshing = False
+        return available
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self.refresh_status, daemon=True).start()
+
+    def _mark_unavailable(self):
+        with self._lock:
+            self._available = False
+            self._checked_at = time.monotonic()
+
+    def is_available(self) -> bool:
+        """Check if Ollama server is available (cached, refreshed in the background)"""
+        if self._available is None:
+            return self.refresh_status()
+
+        if time.monotonic() - self._checked_at > OLLAMA_STATUS_TTL:
+            self._refresh_in_background()
+        return self._available
+
     def ensure_model_pulled(self) -> bool:
         """Ensure the model is downloaded"""
+        if self._model_ready:
+            return True
+
         try:
             # Check if model exists
-            response = requests.get(f"{self.base_url}/api/tags")
-            if response.status_code == 200:
-                models = response.json().get("models", [])
-                for model in models:
-                    if model["name"].startswith(self.model.split(":")[0]):
-                        return True
-            
+            if self.refresh_status() and self._model_ready:
+                return True
+
             # Pull model if not exists
             pull_data = {"name": self.model}
-            response = requests.post(
-                f"{self.base_url}/api/pull", 
+            response = self.session.post(
+                f"{self.base_url}/api/pull",
                 json=pull_data,
                 timeout=300  # 5 minutes timeout for model download
             )
-            return response.status_code == 200
-            
+            if response.status_code == 200:
+                self._model_ready = True
+                return True
+            return False
+
         except Exception as e:
             print(f"Error pulling model: {e}")
             return False
-    
+
+    def _ready(self) -> bool:
+        """Hot-path check using cached state only (no extra round trips when warm)"""
+        if not self.is_available():
+            return False
+        return self._model_ready or self.ensure_model_pulled()
+
+    def _request_body(self, prompt: str, system_prompt: str = None, stream: bool = False) -> Dict[str, Any]:
+        data = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": stream
+        }
+
+        if system_prompt:
+            data["system"] = system_prompt
+        return data
+
     def generate(self, prompt: str, system_prompt: str = None) -> Optional[str]:
         """Generate response using Ollama"""
         try:
-            if not self.is_available():
-                return None
-                
-            # Ensure model is available
-            if not self.ensure_model_pulled():
+            if not self._ready():
                 return None
-            
-            data = {
-                "model": self.model,
-                "prompt": prompt,
-                "stream": False
-            }
-            
-            if system_prompt:
-                data["system"] = system_prompt
-            
-            response = requests.post(
+
+            response = self.session.post(
                 f"{self.base_url}/api/generate",
-                json=data,
+                json=self._request_body(prompt, system_prompt),
                 timeout=30
             )
-            
+
             if response.status_code == 200:
                 result = response.json()
                 return result.get("response", "").strip()
-            
+
+        except requests.ConnectionError as e:
+            print(f"Error generating response: {e}")
+            self._mark_unavailable()
+            return None
         except Exception as e:
             print(f"Error generating response: {e}")
             return None
-        
+
         return None
+
+    async def generate_async(self, prompt: str, system_prompt: str = None) -> Optional[str]:
+        """Generate response using Ollama without blocking the event loop"""
+        import asyncio
+        import httpx
+
+        try:
+            if self._available is None or not self._model_ready:
+                # Cold start only: the status check and pull are blocking calls
+                if not await asyncio.to_thread(self._ready):
+                    return None
+            elif not self.is_available():
+                return None
+
+            response = await self.async_client.post(
+                "/api/generate",
+                json=self._request_body(prompt, system_prompt),
+            )
+
+            if response.status_code == 200:
+                return response.json().get("response", "").strip()
+
+        except httpx.ConnectError as e:
+            print(f"Error generating response: {e}")
+            self._mark_unavailable()
+            return None
+        except Exception as e:
+            print(f"Error generating response: {e}")
+            return None
+
+        return None
+
+    def generate_stream(self, prompt: str, system_prompt: str = None) -> Iterator[str]:
+        """Yield response tokens as Ollama produces them (NDJSON stream)
+
+        Errors before the first token end the stream quietly (callers fall back);
+        errors after it are re-raised so callers can tell the advice is partial.
+        """
+        produced = False
+        try:
+            if not self._ready():
+                return
+
+            with self.session.post(
+                f"{self.base_url}/api/generate",
+                json=self._request_body(prompt, system_prompt, stream=True),
+                stream=True,
+                timeout=30
+            ) as response:
+                if response.status_code != 200:
+                    return
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    message = json.loads(line)
+                    if message.get("response"):
+                        produced = True
+                        yield message["response"]
+                    if message.get("done"):
+                        return
+            if produced:
+                raise IOError("Ollama stream ended before completion")
+
+        except requests.ConnectionError as e:
+            print(f"Error streaming response: {e}")
+            self._mark_unavailable()
+            if produced:
+                raise
+        except Exception as e:
+            print(f"Error streaming response: {e}")
+            if produced:
+                raise
@@ -3,6 +3,9 @@ Vector store management for RAG
 """
 import os
 import json
+import hashlib
+import threading
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 
@@ -19,12 +22,19 @@ try:
 except ImportError:
     SENTENCE_TRANSFORMERS_AVAILABLE = False
 
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "512"))
+
 
 class VectorStore:
     def __init__(self, persist_directory: str = None):
         self.persist_directory = persist_directory or os.getenv("VECTOR_DB_PATH", "./data/vector_store")
         Path(self.persist_directory).mkdir(parents=True, exist_ok=True)
         
+        # LRU of query embeddings keyed by normalized query text
+        self._query_cache = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        
         if not CHROMADB_AVAILABLE:
             print("Warning: ChromaDB not available. Vector search disabled.")
             self.client = None
@@ -33,79 +43,159 @@ class VectorStore:
             
         # Initialize ChromaDB
         self.client = chromadb.PersistentClient(path=self.persist_directory)
+        self.embedding_function = embedding_functions.DefaultEmbeddingFunction()
         
         # Create or get collection
         try:
-            self.collection = self.client.get_collection("chore_advice")
+            self.collection = self.client.get_collection(
+                "chore_advice",
+                embedding_function=self.embedding_function
+            )
         except:
             # Create collection with embedding function
-            embedding_function = embedding_functions.DefaultEmbeddingFunction()
             self.collection = self.client.create_collection(
                 name="chore_advice",
-                embedding_function=embedding_function
+                embedding_function=self.embedding_function
             )
     
     def is_available(self) -> bool:
         """Check if vector store is available"""
         return CHROMADB_AVAILABLE and self.client is not None
     
+    @staticmethod
+    def document_id(doc: Dict[str, Any]) -> str:
+        """Stable ID derived from a document's content and metadata"""
+        payload = "\x1f".join([
+            doc.get("text", ""),
+            doc.get("category", "general"),
+            doc.get("source", "unknown"),
+        ])
+        return "tip_" + hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+    
+    def _upsert_batched(self, documents: List[Dict[str, Any]]):
+        for start in range(0, len(documents), EMBED_BATCH_SIZE):
+            batch = documents[start:start + EMBED_BATCH_SIZE]
+            # Chroma embeds each batch with a single embedding-function call
+            self.collection.upsert(
+                ids=[self.document_id(doc) for doc in batch],
+                documents=[doc.get("text", "") for doc in batch],
+                metadatas=[{
+                    "category": doc.get("category", "general"),
+                    "source": doc.get("source", "unknown")
+                } for doc in batch]
+            )
+    
     def add_documents(self, documents: List[Dict[str, Any]]) -> bool:
-        """Add documents to vector store"""
+        """Add (or update) documents in the vector store"""
         if not self.is_available():
             return False
             
         try:
-            ids = []
-            texts = []
-            metadatas = []
-            
-            for i, doc in enumerate(documents):
-                ids.append(f"doc_{i}")
-                texts.append(doc.get("text", ""))
-                metadatas.append({
-                    "category": doc.get("category", "general"),
-                    "source": doc.get("source", "unknown")
-                })
-            
-            self.collection.add(
-                documents=texts,
-                ids=ids,
-                metadatas=metadatas
-            )
+            self._upsert_batched(documents)
             return True
             
         except Exception as e:
             print(f"Error adding documents: {e}")
             return False
     
+    def sync_documents(self, documents: List[Dict[str, Any]]) -> Optional[Dict[str, int]]:
+        """Make the collection match `documents` exactly.
+
+        Only new or changed documents are embedded; documents that are no
+        longer present (including legacy positional doc_N entries) are deleted.
+        """
+        if not self.is_available():
+            return None
+            
+        try:
+            wanted = {}
+            for doc in documents:
+                wanted[self.document_id(doc)] = doc
+            existing = set(self.collection.get(include=[])["ids"])
+            
+            to_add = [doc for doc_id, doc in wanted.items() if doc_id not in existing]
+            to_delete = [doc_id for doc_id in existing if doc_id not in wanted]
+            
+            if to_add:
+                self._upsert_batched(to_add)
+            for start in range(0, len(to_delete), EMBED_BATCH_SIZE):
+                self.collection.delete(ids=to_delete[start:start + EMBED_BATCH_SIZE])
+            
+            return {
+                "added": len(to_add),
+                "deleted": len(to_delete),
+                "unchanged": len(wanted) - len(to_add),
+            }
+            
+        except Exception as e:
+            print(f"Error syncing documents: {e}")
+            return None
+    
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        return " ".join(query.lower().split())
+    
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Embed queries, reusing cached embeddings and batching the rest in one call"""
+        normalized = [self._normalize_query(q) for q in queries]
+        
+        with self._query_cache_lock:
+            found = {}
+            for text in normalized:
+                if text in self._query_cache:
+                    self._query_cache.move_to_end(text)
+                    found[text] = self._query_cache[text]
+        
+        missing = list(dict.fromkeys(t for t in normalized if t not in found))
+        if missing:
+            for text, embedding in zip(missing, self.embedding_function(missing)):
+                found[text] = embedding
+            with self._query_cache_lock:
+                for text in missing:
+                    self._query_cache[text] = found[text]
+                    self._query_cache.move_to_end(text)
+                while len(self._query_cache) > QUERY_EMBEDDING_CACHE_SIZE:
+                    self._query_cache.popitem(last=False)
+        
+        return [found[text] for text in normalized]
+    
     def search(self, query: str, n_results: int = 3) -> List[Dict[str, Any]]:
         """Search for relevant documents"""
-        if not self.is_available():
-            return []
+        results = self.search_many([query], n_results=n_results)
+        return results[0] if results else []
+    
+    def search_many(self, queries: List[str], n_results: int = 3) -> List[List[Dict[str, Any]]]:
+        """Search for many queries with one batched embedding and query call"""
+        if not self.is_available() or not queries:
+            return [[] for _ in queries]
             
         try:
             results = self.collection.query(
-                query_texts=[query],
+                query_embeddings=self.embed_queries(queries),
                 n_results=n_results
             )
             
-            documents = []
-            if results.get("documents") and results["documents"][0]:
-                for i, doc in enumerate(results["documents"][0]):
-                    metadata = results.get("metadatas", [[]])[0]
-                    distance = results.get("distances", [[]])[0]
-                    
+            all_documents = []
+            for row, row_docs in enumerate(results.get("documents") or []):
+                metadata = (results.get("metadatas") or [[]] * len(queries))[row] or []
+                distance = (results.get("distances") or [[]] * len(queries))[row] or []
+                
+                documents = []
+                for i, doc in enumerate(row_docs or []):
                     documents.append({
                         "text": doc,
                         "metadata": metadata[i] if i < len(metadata) else {},
                         "score": 1 - distance[i] if i < len(distance) else 0.0
                     })
+                all_documents.append(documents)
             
-            return documents
+            while len(all_documents) < len(queries):
+                all_documents.append([])
+            return all_documents
             
         except Exception as e:
             print(f"Error searching documents: {e}")
-            return []
+            return [[] for _ in queries]
     
     def get_collection_count(self) -> int:
         """Get number of documents in collection"""
@@ -119,16 +209,11 @@ class VectorStore:
 
 
 def initialize_knowledge_base(vector_store: VectorStore, knowledge_file: str = None):
-    """Initialize the knowledge base with chore advice"""
+    """Initialize the knowledge base with chore advice, syncing any edits to the tips file"""
     if not vector_store.is_available():
         print("Vector store not available, skipping knowledge base initialization")
         return False
     
-    # Check if already initialized
-    if vector_store.get_collection_count() > 0:
-        print("Knowledge base already initialized")
-        return True
-    
     knowledge_file = knowledge_file or os.path.join(
         os.path.dirname(__file__), "..", "knowledge", "chore_tips.json"
     )
@@ -150,10 +235,14 @@ def initialize_knowledge_base(vector_store: VectorStore, knowledge_file: str = N
                     "source": "chore_tips"
                 })
         
-        success = vector_store.add_documents(documents)
-        if success:
-            print(f"Successfully initialized knowledge base with {len(documents)} documents")
-        return success
+        stats = vector_store.sync_documents(documents)
+        if stats is None:
+            return False
+        print(
+            f"Knowledge base synced: {stats['added']} added, "
+            f"{stats['deleted']} removed, {stats['unchanged']} unchanged"
+        )
+        return True
         
     except Exception as e:
         print(f"Error initializing knowledge base: {e}")
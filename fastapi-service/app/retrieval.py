@@ -0,0 +1,201 @@
+"""
+In-memory retrieval indexes for the knowledge base
+"""
+
+import math
+import os
+import re
+import zlib
+import numpy as np
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+STOPWORDS = frozenset("""
+    a about after all also an and any are as at be been before but by can do
+    does for from get has have how i if in into is it its just keep let make me
+    more my no not of off on once one or our out over so some than that the
+    their them then there these they this to too up use very was we what when
+    where which while who will with you your you'll
+    """.split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed."""
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+class KeywordIndex:
+    """Inverted index with Okapi BM25 scoring.
+
+    Each term's postings hold document ids and their precomputed BM25 weights
+    as NumPy arrays, so a query only adds up the postings of its own terms.
+    """
+
+    def __init__(self, documents: List[str], k1: float = 1.5, b: float = 0.75):
+        self.size = len(documents)
+        postings: Dict[str, Tuple[List[int], List[int]]] = defaultdict(lambda: ([], []))
+        doc_lengths = np.zeros(self.size, dtype=np.float32)
+
+        for doc_id, text in enumerate(documents):
+            terms = Counter(tokenize(text))
+            doc_lengths[doc_id] = sum(terms.values())
+            for term, tf in terms.items():
+                ids, tfs = postings[term]
+                ids.append(doc_id)
+                tfs.append(tf)
+
+        avg_length = float(doc_lengths.mean()) if self.size else 0.0
+        norms = k1 * (1 - b + b * doc_lengths / avg_length) if avg_length else None
+
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for term, (ids, tfs) in postings.items():
+            ids = np.asarray(ids, dtype=np.int32)
+            tfs = np.asarray(tfs, dtype=np.float32)
+            idf = math.log(1 + (self.size - len(ids) + 0.5) / (len(ids) + 0.5))
+            weights = idf * tfs * (k1 + 1) / (tfs + norms[ids])
+            self._postings[term] = (ids, weights.astype(np.float32))
+
+    def search(self, query: str, top_k: int = 3) -> List[Tuple[int, float]]:
+        """Return up to top_k (doc_id, score) pairs, best first."""
+        matched = [
+            self._postings[term]
+            for term in set(tokenize(query))
+            if term in self._postings
+        ]
+        if not matched:
+            return []
+
+        if len(matched) == 1:
+            ids, scores = matched[0]
+        else:
+            ids = np.unique(np.concatenate([p[0] for p in matched]))
+            totals = np.zeros(self.size, dtype=np.float32)
+            for term_ids, weights in matched:
+                # Ids are unique within one term's postings
+                totals[term_ids] += weights
+            scores = totals[ids]
+
+        k = min(top_k, len(ids))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(int(ids[i]), float(scores[i])) for i in best]
+
+
+class HashingEmbedder:
+    """Dependency-free text embeddings via signed feature hashing.
+
+    Words and character trigrams are hashed into a fixed number of dimensions.
+    Stable across processes (crc32, not hash()), so matrices can be persisted.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _features(self, text: str) -> List[str]:
+        features = []
+        for token in tokenize(text):
+            features.append(token)
+            padded = f"<{token}>"
+            features.extend(padded[i : i + 3] for i in range(len(padded) - 2))
+        return features
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            hashes = np.fromiter(
+                (zlib.crc32(f.encode("utf-8")) for f in self._features(text)),
+                dtype=np.uint32,
+            )
+            if not len(hashes):
+                continue
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+            np.add.at(matrix[row], hashes % self.dim, signs)
+        return normalize_rows(matrix)
+
+
+class SentenceTransformerEmbedder:
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name)
+        self.name = f"st-{model_name}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = self.model.encode(texts, convert_to_numpy=True)
+        return normalize_rows(vectors.astype(np.float32))
+
+
+def default_embedder():
+    """Use a sentence-transformers model if EMBEDDING_MODEL is set, else hashing."""
+    model_name = os.getenv("EMBEDDING_MODEL", "")
+    if model_name:
+        try:
+            return SentenceTransformerEmbedder(model_name)
+        except ImportError:
+            print(
+                "Warning: sentence-transformers not available, using hashing embeddings"
+            )
+    return HashingEmbedder()
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(matrix / norms, dtype=np.float32)
+
+
+class EmbeddingIndex:
+    """Brute-force cosine search over a contiguous float32 matrix.
+
+    Rows are L2-normalized, so one matrix-vector product scores every
+    document. The matrix can be saved and memory-mapped back with np.load.
+    """
+
+    def __init__(self, embeddings: np.ndarray):
+        self.embeddings = embeddings
+
+    @classmethod
+    def build(cls, texts: List[str], embedder) -> "EmbeddingIndex":
+        if not texts:
+            return cls(np.zeros((0, getattr(embedder, "dim", 1)), dtype=np.float32))
+        return cls(normalize_rows(embedder.embed(texts)))
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "EmbeddingIndex":
+        return cls(np.load(path, mmap_mode="r" if mmap else None))
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp.npy"
+        np.save(tmp_path, np.ascontiguousarray(self.embeddings, dtype=np.float32))
+        os.replace(tmp_path, path)
+
+    @property
+    def size(self) -> int:
+        return self.embeddings.shape[0]
+
+    def search(self, query: np.ndarray, top_k: int = 3) -> List[Tuple[int, float]]:
+        """Top-k (doc_id, cosine) for one normalized query vector."""
+        return self.search_many(query.reshape(1, -1), top_k)[0]
+
+    def search_many(
+        self, queries: np.ndarray, top_k: int = 3
+    ) -> List[List[Tuple[int, float]]]:
+        """Top-k results for a batch of normalized query vectors (one row each)."""
+        if self.size == 0 or len(queries) == 0:
+            return [[] for _ in range(len(queries))]
+
+        scores = np.asarray(queries, dtype=np.float32) @ self.embeddings.T
+        k = min(top_k, self.size)
+        best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(scores, best, axis=1)
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        best = np.take_along_axis(best, order, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        return [
+            [(int(i), float(s)) for i, s in zip(ids, row_scores)]
+            for ids, row_scores in zip(best, best_scores)
+        ]
@@ -0,0 +1,215 @@
+"""
+Two-tier (memory + disk) cache for synthesized TTS audio
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+TTS_CACHE_DIR = os.getenv(
+    "TTS_CACHE_DIR", os.path.join(os.path.dirname(__file__), "data", "tts_cache")
+)
+TTS_CACHE_MAX_ITEMS = int(os.getenv("TTS_CACHE_MAX_ITEMS", "256"))
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+def audio_cache_key(text: str, voice: str, tld: str, engine: str) -> str:
+    """Content address for a clip: identical inputs always map to the same key."""
+    payload = "\x1f".join([engine, voice, tld, text])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    def __init__(
+        self,
+        cache_dir: str = None,
+        max_items: int = TTS_CACHE_MAX_ITEMS,
+        max_bytes: int = TTS_CACHE_MAX_BYTES,
+    ):
+        self.cache_dir = cache_dir or TTS_CACHE_DIR
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, "_InflightClip"] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.mp3")
+
+    def _remember(self, key: str, data: bytes):
+        """Insert into the in-memory LRU, evicting the oldest clips if needed."""
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= len(old)
+            self._memory[key] = data
+            self._memory_bytes += len(data)
+            while self._memory and (
+                len(self._memory) > self.max_items
+                or self._memory_bytes > self.max_bytes
+            ):
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def get_memory(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+            return data
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Look up a clip in memory, then on disk (promoting disk hits)."""
+        data = self.get_memory(key)
+        if data is not None:
+            return data
+
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        self._remember(key, data)
+        return data
+
+    def put(self, key: str, data: bytes):
+        """Store a clip in both tiers. Disk writes are atomic (write + rename)."""
+        self._remember(key, data)
+
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"TTS cache write failed: {e}")
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    def contains(self, key: str) -> bool:
+        with self._lock:
+            if key in self._memory:
+                return True
+        return os.path.exists(self._path(key))
+
+    async def lookup(self, key: str) -> Optional[bytes]:
+        """Async variant of get() that keeps disk reads off the event loop."""
+        data = self.get_memory(key)
+        if data is not None:
+            return data
+        return await asyncio.to_thread(self.get, key)
+
+    async def stream(
+        self, key: str, producer: Callable[[], AsyncIterator[bytes]]
+    ) -> Tuple[AsyncIterator[bytes], str]:
+        """Return (chunk iterator, cache_status) for a key.
+
+        On a miss the producer runs in a background task and its chunks are
+        forwarded to every subscriber as they arrive, so concurrent requests for
+        the same key share one synthesis. The finished clip is then cached. This
+        waits for the first chunk, so synthesis errors surface before any
+        response is started.
+        """
+        data = await self.lookup(key)
+        if data is not None:
+            return _single_chunk(data), "HIT"
+
+        clip = self._inflight.get(key)
+        status = "COALESCED"
+        if clip is None:
+            clip = _InflightClip()
+            self._inflight[key] = clip
+            # Not tied to this request, so a disconnecting client cannot
+            # cancel synthesis that other subscribers are waiting on
+            task = asyncio.create_task(self._fill(key, clip, producer))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            status = "MISS"
+
+        await clip.wait_started()
+        return clip.subscribe(), status
+
+    async def _fill(
+        self,
+        key: str,
+        clip: "_InflightClip",
+        producer: Callable[[], AsyncIterator[bytes]],
+    ):
+        try:
+            async for chunk in producer():
+                await clip.append(chunk)
+            data = b"".join(clip.chunks)
+            self._remember(key, data)
+            await clip.finish()
+            await asyncio.to_thread(self.put, key, data)
+        except Exception as e:
+            await clip.fail(e)
+        finally:
+            self._inflight.pop(key, None)
+
+
+class _InflightClip:
+    """Chunks of a clip being synthesized, readable by any number of subscribers."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.done = False
+        self.error: Optional[Exception] = None
+        self._changed = asyncio.Condition()
+
+    async def _notify(self):
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def append(self, chunk: bytes):
+        self.chunks.append(chunk)
+        await self._notify()
+
+    async def finish(self):
+        self.done = True
+        await self._notify()
+
+    async def fail(self, error: Exception):
+        self.error = error
+        await self._notify()
+
+    async def wait_started(self):
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.chunks or self.done or self.error)
+        if self.error and not self.chunks:
+            raise self.error
+
+    async def subscribe(self) -> AsyncIterator[bytes]:
+        index = 0
+        while True:
+            while index < len(self.chunks):
+                yield self.chunks[index]
+                index += 1
+            if self.error:
+                raise self.error
+            if self.done:
+                return
+            async with self._changed:
+                await self._changed.wait_for(
+                    lambda: len(self.chunks) > index or self.done or self.error
+                )
+
+
+async def _single_chunk(data: bytes) -> AsyncIterator[bytes]:
+    yield data
+
+
+# Global instance
+tts_cache = AudioCache()
@@ -0,0 +1,155 @@
+"""
+Shared TTS helpers: voice mapping, chore scripts and gTTS synthesis
+"""
+
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List
+
+from mp3 import audio_frames
+from tts_cache import audio_cache_key
+from tts_pool import TTS_MAX_WORKERS
+
+# Optional HTTP synthesis service used instead of gTTS (e.g. loadtest/fake_upstreams.py)
+TTS_UPSTREAM_URL = os.getenv("TTS_UPSTREAM_URL", "")
+TTS_ENGINE = "upstream" if TTS_UPSTREAM_URL else "gtts"
+MAX_TTS_CHARS = 1500
+
+# Caps engine calls across the whole process (whole clips and segments alike)
+# at TTS_MAX_WORKERS, however clips are split up
+_synthesis_slots = threading.BoundedSemaphore(TTS_MAX_WORKERS)
+# Shared by every clip for synthesizing its segments in parallel
+_segment_executor = ThreadPoolExecutor(
+    max_workers=TTS_MAX_WORKERS, thread_name_prefix="tts-segment"
+)
+
+# Map voice_id to Edge TTS voices
+VOICE_MAP = {
+    "21m00Tcm4TlvDq8ikWAM": "en-US-AriaNeural",
+    "default": "en-US-AriaNeural",
+    "male": "en-US-GuyNeural",
+    "female": "en-US-JennyNeural",
+    "british": "en-GB-SoniaNeural",
+}
+DEFAULT_VOICE = "en-US-AriaNeural"
+
+# Sentence ends, plus the "Step N:" prefixes chore_script puts before each step,
+# so a step's text is one segment shared by every chore that has that step
+SEGMENT_BOUNDARY_RE = re.compile(r"(?<=[.!?])\s+|(?<=Step \d:)\s+|(?<=Step \d\d:)\s+")
+
+
+def resolve_voice(voice_id: str) -> str:
+    return VOICE_MAP.get(voice_id, DEFAULT_VOICE)
+
+
+def voice_tld(voice: str) -> str:
+    """Map a voice name to the Google Translate top-level domain (accent)."""
+    if "GB" in voice or "british" in voice.lower():
+        return "co.uk"  # British accent
+    elif "AU" in voice:
+        return "com.au"  # Australian accent
+    return "com"
+
+
+def chore_script(chore: dict) -> str:
+    items = ", ".join(chore.get("items") or [])
+    steps = chore.get("steps") or []
+    steps_txt = " ".join([f"Step {i+1}: {s}." for i, s in enumerate(steps)])
+    items_txt = f"You'll need: {items}. " if items else ""
+    return f'{chore["title"]}. Estimated time: {chore.get("time_min",0)} minutes. {items_txt}{steps_txt}'.strip()[
+        :MAX_TTS_CHARS
+    ]
+
+
+def engine_voice(voice: str) -> str:
+    """The part of a voice the engine actually varies on (gTTS only has accents)."""
+    return voice if TTS_UPSTREAM_URL else voice_tld(voice)
+
+
+def clip_key(text: str, voice: str) -> str:
+    """Cache key for the clip /tts would produce for this text and voice."""
+    # Identical (text, effective voice, accent, engine) always yields identical
+    # audio, so voices that sound the same to the engine share one clip
+    return audio_cache_key(
+        text[:MAX_TTS_CHARS], engine_voice(voice), voice_tld(voice), TTS_ENGINE
+    )
+
+
+def split_segments(text: str) -> List[str]:
+    """Split a script into sentence / step segments that are synthesized separately."""
+    return [part for part in SEGMENT_BOUNDARY_RE.split(text.strip()) if part]
+
+
+def upstream_chunks(text: str, voice: str = DEFAULT_VOICE) -> Iterator[bytes]:
+    """Blocking POST of {text, voice} to TTS_UPSTREAM_URL; yields MP3 chunks as they arrive"""
+    import requests
+
+    with requests.post(
+        TTS_UPSTREAM_URL,
+        json={"text": text[:MAX_TTS_CHARS], "voice": voice},
+        stream=True,
+        timeout=30,
+    ) as response:
+        response.raise_for_status()
+        yield from response.iter_content(chunk_size=16384)
+
+
+def gtts_chunks(text: str, voice: str = DEFAULT_VOICE) -> Iterator[bytes]:
+    """Blocking Google Translate TTS; yields one MP3 chunk per ~100-character part"""
+    if TTS_UPSTREAM_URL:
+        yield from upstream_chunks(text, voice)
+        return
+
+    from gtts import gTTS
+
+    tts = gTTS(text=text[:MAX_TTS_CHARS], lang="en", tld=voice_tld(voice), slow=False)
+    yield from tts.stream()
+
+
+def render_segment(text: str, voice: str = DEFAULT_VOICE) -> bytes:
+    """Synthesize one segment as a standalone clip (blocking)."""
+    with _synthesis_slots:
+        return b"".join(gtts_chunks(text, voice))
+
+
+def clip_chunks(text: str, voice: str = DEFAULT_VOICE, cache=None) -> Iterator[bytes]:
+    """Blocking synthesis of a whole clip as sentence / step segments.
+
+    Segments already in the cache are reused and new ones are stored, so
+    phrases shared by many chores are synthesized once. Missing segments are
+    synthesized in parallel on the shared segment executor and yielded in
+    order as MP3 frames as soon as each one and everything before it is ready.
+    """
+    segments = split_segments(text[:MAX_TTS_CHARS])
+    if len(segments) <= 1:
+        with _synthesis_slots:
+            yield from gtts_chunks(text, voice)
+        return
+
+    def fetch(segment: str) -> bytes:
+        key = clip_key(segment, voice)
+        data = cache.get(key) if cache else None
+        if data is None:
+            data = render_segment(segment, voice)
+            if cache:
+                cache.put(key, data)
+        return data
+
+    futures = {
+        segment: _segment_executor.submit(fetch, segment)
+        for segment in dict.fromkeys(segments)
+    }
+    try:
+        for segment in segments:
+            yield audio_frames(futures[segment].result())
+    finally:
+        # Drop segments nobody will read if the consumer stopped early
+        for future in futures.values():
+            future.cancel()
+
+
+def render_clip(text: str, voice: str = DEFAULT_VOICE, cache=None) -> bytes:
+    """Synthesize a whole clip (blocking), exactly as /tts streams it."""
+    return b"".join(clip_chunks(text, voice, cache))
@@ -0,0 +1,132 @@
+"""
+Bounded worker pool for blocking TTS synthesis
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, Iterator
+
+TTS_MAX_WORKERS = int(os.getenv("TTS_MAX_WORKERS", "4"))
+TTS_MAX_QUEUE = int(os.getenv("TTS_MAX_QUEUE", "16"))
+TTS_RETRY_AFTER_SECONDS = int(os.getenv("TTS_RETRY_AFTER_SECONDS", "2"))
+
+
+class PoolSaturated(Exception):
+    """Raised when the synthesis queue is full and new work is rejected."""
+
+    def __init__(self, retry_after: int = TTS_RETRY_AFTER_SECONDS):
+        super().__init__("TTS synthesis queue is full")
+        self.retry_after = retry_after
+
+
+class SynthesisPool:
+    def __init__(
+        self, max_workers: int = TTS_MAX_WORKERS, max_queue: int = TTS_MAX_QUEUE
+    ):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="tts"
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _admit(self):
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                raise PoolSaturated()
+            self._queued += 1
+            self._submitted += 1
+
+    def _started(self, waited: float):
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+    def _finished(self, ok: bool):
+        with self._lock:
+            self._active -= 1
+            if ok:
+                self._completed += 1
+            else:
+                self._failed += 1
+
+    async def stream(
+        self, make_chunks: Callable[[], Iterator[bytes]]
+    ) -> AsyncIterator[bytes]:
+        """Run a blocking chunk generator on a pool thread and yield its chunks.
+
+        The whole generator runs on one worker, so the pool size caps the number
+        of concurrent syntheses. Raises PoolSaturated instead of queueing once
+        max_queue jobs are already waiting for a worker.
+        """
+        self._admit()
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        abandoned = threading.Event()
+        enqueued_at = time.monotonic()
+
+        def work():
+            self._started(time.monotonic() - enqueued_at)
+            ok = False
+            try:
+                if abandoned.is_set():
+                    return
+                for chunk in make_chunks():
+                    if abandoned.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, (chunk, None))
+                ok = True
+                loop.call_soon_threadsafe(queue.put_nowait, (None, None))
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, (None, e))
+            finally:
+                self._finished(ok)
+
+        self._executor.submit(work)
+        try:
+            while True:
+                chunk, error = await queue.get()
+                if error is not None:
+                    raise error
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            # Stop the worker early if the consumer went away
+            abandoned.set()
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            started = self._submitted - self._queued
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "active": self._active,
+                "queue_depth": self._queued,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "avg_wait_ms": (
+                    round(1000 * self._wait_total / started, 2) if started > 0 else 0.0
+                ),
+                "max_wait_ms": round(1000 * self._wait_max, 2),
+            }
+
+
+# Global instance
+tts_pool = SynthesisPool()
@@ -0,0 +1,123 @@
+"""
+Pre-render chore script audio for the whole catalog into the TTS cache
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+from tts_cache import AudioCache, tts_cache
+from tts_engine import (
+    TTS_ENGINE,
+    VOICE_MAP,
+    chore_script,
+    clip_key,
+    engine_voice,
+    render_clip,
+)
+
+MANIFEST_NAME = "prerender_manifest.json"
+
+
+def chore_content_hash(chore: Dict) -> str:
+    payload = json.dumps(chore, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(f"{TTS_ENGINE}\x1f{payload}".encode("utf-8")).hexdigest()
+
+
+def catalog_voices() -> List[str]:
+    """One voice per distinct sound reachable through /tts voice ids, in a stable order."""
+    voices = {}
+    for voice in sorted(set(VOICE_MAP.values())):
+        voices.setdefault(engine_voice(voice), voice)
+    return sorted(voices.values())
+
+
+def _manifest_path(cache: AudioCache) -> str:
+    return os.path.join(cache.cache_dir, MANIFEST_NAME)
+
+
+def _load_manifest(cache: AudioCache) -> Dict:
+    try:
+        with open(_manifest_path(cache), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(cache: AudioCache, manifest: Dict):
+    path = _manifest_path(cache)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # A unique temp file, so concurrent prerender runs never write into each other's
+    with tempfile.NamedTemporaryFile(
+        "w", dir=os.path.dirname(path), suffix=".tmp", delete=False
+    ) as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(f.name, path)
+
+
+def prerender_catalog(
+    chores: List[Dict],
+    cache: AudioCache = None,
+    force: bool = False,
+    verbose: bool = False,
+) -> Dict:
+    """Render chore_script audio for every chore and voice into the cache.
+
+    A manifest in the cache directory remembers each chore's content hash and
+    clip keys, so only new or changed chores are synthesized again. Clips of
+    changed or deleted chores stay in the store: keys are content addressed,
+    so another chore or a free-text /tts request may still use them.
+    """
+    cache = cache or tts_cache
+    manifest = _load_manifest(cache)
+    voices = catalog_voices()
+    stats = {"rendered": 0, "skipped": 0, "failed": 0}
+    started = time.perf_counter()
+
+    seen = set()
+    for chore in chores:
+        chore_id = chore["id"]
+        seen.add(chore_id)
+        content_hash = chore_content_hash(chore)
+        script = chore_script(chore)
+        keys = {voice: clip_key(script, voice) for voice in voices}
+
+        entry = manifest.get(chore_id)
+        if (
+            not force
+            and entry
+            and entry.get("hash") == content_hash
+            and all(cache.contains(key) for key in keys.values())
+        ):
+            stats["skipped"] += 1
+            continue
+
+        ok = True
+        for voice, key in keys.items():
+            if not force and cache.contains(key):
+                continue
+            try:
+                cache.put(key, render_clip(script, voice, cache))
+                stats["rendered"] += 1
+            except Exception as e:
+                ok = False
+                stats["failed"] += 1
+                print(f"Failed to render '{chore_id}' ({voice}): {e}")
+
+        if ok:
+            manifest[chore_id] = {"hash": content_hash, "keys": keys}
+        if stats["rendered"] and stats["rendered"] % 50 == 0:
+            # Checkpoint so an interrupted run resumes where it stopped
+            _save_manifest(cache, manifest)
+        if verbose:
+            print(f"{'Rendered' if ok else 'Partially rendered'}: {chore_id}")
+
+    for chore_id in set(manifest) - seen:
+        del manifest[chore_id]
+    _save_manifest(cache, manifest)
+
+    stats["seconds"] = round(time.perf_counter() - started, 2)
+    return stats
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the database, search and retrieval hot paths.
+
+Each benchmark reports ops/sec, p50/p99 latency and peak bytes allocated per
+call (tracemalloc), and the run is saved as JSON tagged with the git commit.
+All data is synthetic and lives in a temporary directory; the real chores.db
+is never touched.
+
+Data is seeded with plain SQL and benchmarks whose function does not exist in
+the checked-out tree are skipped, so the same script runs on older commits and
+--compare lines up the cases both sides have.
+
+Usage:
+  python benchmarks/bench.py
+  python benchmarks/bench.py --chores 10,10000,1000000 --tips 50,500000
+  python benchmarks/bench.py --only search --compare benchmarks/results/<old>.json
+  python benchmarks/bench.py --vector-store   # also ChromaDB (needs its model)
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterator, List, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.join(os.path.dirname(BENCH_DIR), "app")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+from synthetic import chore_id, make_chores, make_queries, make_tips  # noqa: E402
+
+
+def measure(
+    name: str,
+    fn: Callable[[], object],
+    size: int,
+    min_time: float,
+    max_iterations: int = 100_000,
+    alloc_iterations: int = 50,
+) -> Dict:
+    """Time fn repeatedly, then measure its allocations in a separate pass."""
+    fn()  # warm up caches and prepared statements
+
+    samples: List[int] = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < max_iterations and (
+        time.perf_counter() < deadline or len(samples) < 5
+    ):
+        started = time.perf_counter_ns()
+        fn()
+        samples.append(time.perf_counter_ns() - started)
+    samples.sort()
+
+    # tracemalloc slows everything down, so it never overlaps the timing pass
+    peaks = []
+    tracemalloc.start()
+    for _ in range(max(1, min(alloc_iterations, len(samples)))):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        fn()
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+    peaks.sort()
+
+    total_ns = sum(samples)
+    result = {
+        "name": name,
+        "size": size,
+        "iterations": len(samples),
+        "ops_per_sec": round(len(samples) / (total_ns / 1e9), 2),
+        "mean_us": round(total_ns / len(samples) / 1000, 2),
+        "p50_us": round(samples[len(samples) // 2] / 1000, 2),
+        "p99_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] / 1000, 2),
+        "peak_alloc_bytes": peaks[len(peaks) // 2],
+    }
+    print(
+        f"{name:<32} {size:>9,} {result['ops_per_sec']:>12,.1f} "
+        f"{result['p50_us']:>11,.1f} {result['p99_us']:>11,.1f} "
+        f"{result['peak_alloc_bytes']:>12,}"
+    )
+    return result
+
+
+def cycling(values: List) -> Callable[[], object]:
+    """Pre-generated inputs, so input generation is not part of the timing."""
+    return itertools.cycle(values).__next__
+
+
+def run_cases(cases: List[Tuple], size: int, args, skipped: set) -> List[Dict]:
+    """Measure (name, fn, alloc_iterations) cases; fn is None where the tree lacks it."""
+    results = []
+    for name, fn, alloc_iterations in cases:
+        if args.only and args.only not in name:
+            continue
+        if fn is None:
+            if name not in skipped:
+                print(f"-- {name} does not exist in this tree, skipped")
+                skipped.add(name)
+            continue
+        results.append(
+            measure(name, fn, size, args.min_time, alloc_iterations=alloc_iterations)
+        )
+    return results
+
+
+def seed_chores(path: str, chores: Iterator[Dict]):
+    """Insert chores with plain SQL into whichever chores schema the file has.
+
+    A new file gets the original JSON-column table, which every version of
+    init_database either uses as it is or migrates.
+    """
+    conn = sqlite3.connect(path)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS chores (
+            id TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            items TEXT,
+            steps TEXT,
+            time_min INTEGER
+        )
+    """
+    )
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(chores)")]
+    with conn:
+        while True:
+            batch = list(itertools.islice(chores, 10_000))
+            if not batch:
+                break
+            if "items" in columns:
+                conn.executemany(
+                    "INSERT INTO chores (id, title, items, steps, time_min) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (c["id"], c["title"], json.dumps(c["items"]), json.dumps(c["steps"]),
+                         c["time_min"])
+                        for c in batch
+                    ],
+                )
+                continue
+            # Normalized schema: item dictionary plus ordered items and steps
+            conn.executemany(
+                "INSERT INTO chores (id, title, time_min) VALUES (?, ?, ?)",
+                [(c["id"], c["title"], c["time_min"]) for c in batch],
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO items (name) VALUES (?)",
+                [(name,) for name in {name for c in batch for name in c["items"]}],
+            )
+            conn.executemany(
+                "INSERT INTO chore_items (chore_id, position, item_id) "
+                "SELECT ?, ?, id FROM items WHERE name = ?",
+                [(c["id"], i, name) for c in batch for i, name in enumerate(c["items"])],
+            )
+            conn.executemany(
+                "INSERT INTO chore_steps (chore_id, position, text) VALUES (?, ?, ?)",
+                [(c["id"], i, step) for c in batch for i, step in enumerate(c["steps"])],
+            )
+    conn.close()
+
+
+def bench_database(sizes: List[int], args) -> List[Dict]:
+    import database
+
+    try:
+        from catalog import chore_catalog, encode_body
+    except ImportError:
+        chore_catalog = encode_body = None
+
+    # Older trees hard-code the path next to the module, i.e. the real chores.db
+    db_path = os.environ["CHORES_DB_PATH"]
+    database.DATABASE_PATH = db_path
+
+    results = []
+    skipped = set()
+    loaded = 0
+    for size in sorted(sizes):
+        started = time.perf_counter()
+        seed_chores(db_path, make_chores(loaded, size, args.seed))
+        loaded = size
+        # Migrates the first batch and indexes new rows for search where needed
+        database.init_database()
+        for value in list(vars(database).values()):
+            if hasattr(value, "cache_clear"):  # lru_cache'd reads
+                value.cache_clear()
+        if chore_catalog:
+            chore_catalog.refresh(force=True)
+        print(f"-- {size:,} chores loaded in {time.perf_counter() - started:.1f}s")
+
+        # Heavy whole-catalog calls get fewer allocation samples at large sizes
+        heavy = 3 if size > 100_000 else 20
+        next_id = cycling([chore_id(i * 7919 % size) for i in range(1000)])
+        next_query = cycling(make_queries(200, args.seed))
+        next_item = cycling(["Sponge", "Vinegar", "Mop", "Labels", "Gloves"])
+        next_cursor = cycling([None] + [chore_id(i * 7919 % size) for i in range(200)])
+
+        by_item = getattr(database, "get_chores_by_item", None)
+        catalog = chore_catalog
+        cases = [
+            ("database.get_all_chores", database.get_all_chores, heavy),
+            ("database.get_chore_by_id", lambda: database.get_chore_by_id(next_id()), 50),
+            ("database.search_chores", lambda: database.search_chores(next_query()), 50),
+            ("database.get_chores_by_item", by_item and (lambda: by_item(next_item())), heavy),
+            ("catalog.get", catalog and (lambda: catalog.get(next_id())), 50),
+            ("catalog.list_body", catalog and catalog.list_body, 50),
+            ("catalog.page_body[50]", catalog and (lambda: catalog.page_body(next_cursor(), 50)), 50),
+            ("catalog.encode_list", catalog and (lambda: encode_body({"chores": catalog.all()})), heavy),
+        ]
+        results += run_cases(cases, size, args, skipped)
+    return results
+
+
+def bench_retrieval(sizes: List[int], args) -> List[Dict]:
+    from groq_rag import GroqRAG
+
+    results = []
+    skipped = set()
+    rag = GroqRAG()
+    queries = make_queries(256, args.seed)
+    next_query = cycling(queries)
+    semantic = getattr(rag, "_semantic_search", None)
+    search_many = getattr(rag, "search_many", None)
+    for size in sorted(sizes):
+        started = time.perf_counter()
+        rag.knowledge_base = make_tips(size, args.seed)
+        # Rebuild whichever indexes this tree keeps over the knowledge base
+        if hasattr(rag, "keyword_index"):
+            from retrieval import KeywordIndex
+
+            rag.keyword_index = KeywordIndex(
+                [rag._entry_text(e) for e in rag.knowledge_base]
+            )
+        if hasattr(rag, "_load_embeddings"):
+            rag._load_embeddings()
+        print(f"-- {size:,} tips indexed in {time.perf_counter() - started:.1f}s")
+
+        cases = [
+            ("groq_rag._simple_search", lambda: rag._simple_search(next_query()), 50),
+            ("groq_rag._semantic_search", semantic and (lambda: semantic(next_query())), 50),
+            ("groq_rag.search_many[32]", search_many and (lambda: search_many(queries[:32])), 50),
+        ]
+        results += run_cases(cases, size, args, skipped)
+
+        if args.vector_store:
+            results.extend(bench_vector_store(rag.knowledge_base, queries, args))
+    return results
+
+
+def bench_vector_store(tips: List[Dict], queries: List[str], args) -> List[Dict]:
+    from rag.vector_store import VectorStore
+
+    store = VectorStore(persist_directory=tempfile.mkdtemp(dir=os.environ["BENCH_TMP"]))
+    if not store.is_available():
+        print("-- ChromaDB not available, skipping VectorStore benchmarks")
+        return []
+    store.add_documents(
+        [{"text": t["tip"], "category": t["category"], "source": "bench"} for t in tips]
+    )
+    next_query = cycling(queries)
+    search_many = getattr(store, "search_many", None)
+    cases = [
+        ("vector_store.search", lambda: store.search(next_query()), 50),
+        ("vector_store.search_many[32]", search_many and (lambda: search_many(queries[:32])), 50),
+    ]
+    return run_cases(cases, len(tips), args, set())
+
+
+def git_info() -> Dict:
+    def git(*cmd) -> str:
+        try:
+            return subprocess.run(
+                ["git", *cmd], cwd=BENCH_DIR, capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
+
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "subject": git("log", "-1", "--format=%s"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+
+def compare(results: List[Dict], baseline_path: str):
+    """Print ops/sec and p99 changes against an earlier results file."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    before = {(r["name"], r["size"]): r for r in baseline["results"]}
+    commit = baseline["meta"]["git"]["commit"][:10] or "?"
+    print(f"\nCompared with {commit} ({os.path.basename(baseline_path)}):")
+    print(f"{'benchmark':<32} {'size':>9} {'ops/sec':>10} {'p99':>10}")
+    for r in results:
+        old = before.get((r["name"], r["size"]))
+        if not old:
+            continue
+        speed = r["ops_per_sec"] / old["ops_per_sec"] if old["ops_per_sec"] else 0
+        tail = r["p99_us"] / old["p99_us"] if old["p99_us"] else 0
+        print(f"{r['name']:<32} {r['size']:>9,} {speed:>9.2f}x {tail:>9.2f}x")
+
+
+def parse_sizes(value: str) -> List[int]:
+    return [int(float(v)) for v in value.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--chores", type=parse_sizes, default=[10, 1000, 100_000],
+                        help="catalog sizes, e.g. 10,10000,1e6")
+    parser.add_argument("--tips", type=parse_sizes, default=[50, 5000, 50_000],
+                        help="knowledge-base sizes, e.g. 50,500000")
+    parser.add_argument("--only", default="", help="run benchmarks whose name contains this")
+    parser.add_argument("--min-time", type=float, default=0.5,
+                        help="seconds to run each benchmark (at least 5 calls)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--vector-store", action="store_true",
+                        help="also benchmark the ChromaDB VectorStore")
+    parser.add_argument("--out", default=None, help="results file (default: results/)")
+    parser.add_argument("--compare", default=None, help="earlier results file to compare with")
+    args = parser.parse_args()
+
+    # Everything the app modules read at import time points into a scratch dir
+    tmp = tempfile.mkdtemp(prefix="chore-bench-")
+    os.environ["BENCH_TMP"] = tmp
+    os.environ["CHORES_DB_PATH"] = os.path.join(tmp, "chores.db")
+    os.environ["KNOWLEDGE_EMBEDDINGS_DIR"] = os.path.join(tmp, "embeddings")
+    os.environ["TTS_CACHE_DIR"] = os.path.join(tmp, "tts_cache")
+    os.environ["VECTOR_DB_PATH"] = os.path.join(tmp, "vector_store")
+    os.environ["RAG_RETRIEVAL"] = "keyword"
+    sys.path.insert(0, APP_DIR)
+
+    print(f"{'benchmark':<32} {'size':>9} {'ops/sec':>12} {'p50 us':>11} {'p99 us':>11} {'peak alloc B':>12}")
+    started = time.time()
+    results = bench_database(args.chores, args) + bench_retrieval(args.tips, args)
+
+    git = git_info()
+    run = {
+        "meta": {
+            "git": git,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(started)),
+            "seconds": round(time.time() - started, 1),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "chores_sizes": args.chores,
+            "tips_sizes": args.tips,
+            "min_time": args.min_time,
+        },
+        "results": results,
+    }
+    out = args.out or os.path.join(
+        RESULTS_DIR,
+        f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(started))}-{git['commit'][:10] or 'nogit'}.json",
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(run, f, indent=2)
+    print(f"\nSaved {len(results)} results to {out}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Deterministic synthetic chores and knowledge-base tips for benchmarks
+"""
+
+import random
+from typing import Dict, Iterator, List
+
+VERBS = ["Clean", "Wipe", "Organize", "Dust", "Scrub", "Sort", "Polish", "Vacuum"]
+PLACES = [
+    "kitchen counter", "bathroom sink", "desk", "bookshelf", "fridge", "oven",
+    "closet", "garage", "window", "mirror", "pantry", "laundry room", "stairs",
+    "balcony", "microwave", "bed", "sofa", "floor", "cabinet", "drawer",
+]
+ITEMS = [
+    "Microfiber cloth", "Sponge", "Dish soap", "Vinegar", "Baking soda",
+    "All-purpose cleaner", "Glass cleaner", "Trash bag", "Bucket", "Mop",
+    "Broom", "Vacuum", "Scrub brush", "Gloves", "Paper towels", "Duster",
+    "Storage box", "Labels", "Lemon", "Toothbrush",
+]
+STEP_TEMPLATES = [
+    "Clear everything off the {place}",
+    "Spray {item} on the {place}",
+    "Wipe the {place} with a {item}",
+    "Scrub stubborn spots on the {place}",
+    "Rinse and dry the {place}",
+    "Put items back on the {place}",
+    "Throw away anything you no longer need",
+    "Wipe the surface",
+    "Dry with a cloth",
+]
+CATEGORIES = [
+    "kitchen_cleaning", "bathroom_cleaning", "organization", "laundry",
+    "motivation", "time_management", "general_tips",
+]
+TIP_WORDS = (
+    "start small surface top bottom timer music routine declutter spray wait "
+    "minutes wipe dry rinse soak stains grease dust corners habit daily weekly "
+    "gloves ventilation vinegar baking soda lemon cloth sponge brush bin labels"
+).split()
+
+
+def chore_id(index: int) -> str:
+    return f"chore-{index:07d}"
+
+
+def make_chore(index: int, seed: int = 0) -> Dict:
+    """The chore at a given index (same index and seed, same chore)."""
+    rng = random.Random(seed * 1_000_003 + index)
+    place = rng.choice(PLACES)
+    items = rng.sample(ITEMS, rng.randint(0, 5))
+    steps = [
+        template.format(place=place, item=(rng.choice(items) if items else "cloth"))
+        for template in rng.sample(STEP_TEMPLATES, rng.randint(3, 7))
+    ]
+    return {
+        "id": chore_id(index),
+        "title": f"{rng.choice(VERBS)} the {place}",
+        "items": items,
+        "steps": steps,
+        "time_min": rng.randint(2, 60),
+    }
+
+
+def make_chores(start: int, stop: int, seed: int = 0) -> Iterator[Dict]:
+    """Chores for indexes [start, stop), generated lazily."""
+    for index in range(start, stop):
+        yield make_chore(index, seed)
+
+
+def make_tips(count: int, seed: int = 0) -> List[Dict]:
+    """Knowledge-base entries in the format groq_rag loads."""
+    rng = random.Random(seed)
+    return [
+        {
+            "category": rng.choice(CATEGORIES),
+            "tip": " ".join(rng.choices(TIP_WORDS, k=rng.randint(8, 20))).capitalize(),
+            "context": rng.choice(PLACES),
+        }
+        for _ in range(count)
+    ]
+
+
+def make_queries(count: int, seed: int = 0) -> List[str]:
+    """Free-text queries resembling what chores send to retrieval and search."""
+    rng = random.Random(seed + 1)
+    return [
+        f"{rng.choice(VERBS).lower()} {rng.choice(PLACES)} {rng.choice(TIP_WORDS)}"
+        for _ in range(count)
+    ]
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins for the Groq, Ollama and TTS upstreams, for load testing.
+
+One server emulates all three APIs with configurable latency distributions
+(lognormal from a p50 and p99), error rates and token streaming:
+
+  Groq (OpenAI-compatible)  POST /openai/v1/chat/completions  (stream or not)
+  Ollama                    GET /api/tags, POST /api/pull, POST /api/generate
+  TTS                       POST /tts  {text, voice} -> silent MP3 frames
+  Counters                  GET /stats, POST /stats/reset
+
+Point the API at it with:
+  GROQ_API_KEY=fake GROQ_BASE_URL=http://localhost:9100
+  OLLAMA_BASE_URL=http://localhost:9100
+  TTS_UPSTREAM_URL=http://localhost:9100/tts
+
+Usage:
+  python loadtest/fake_upstreams.py --port 9100
+  python loadtest/fake_upstreams.py --llm-latency 400,2500 --token-delay 20 --llm-error-rate 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from collections import Counter
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+app = FastAPI(title="Fake upstreams")
+
+# Overwritten from the command line in main()
+settings = {
+    "llm_latency": (300.0, 1500.0),  # time to first token, p50/p99 ms
+    "llm_error_rate": 0.0,
+    "token_delay": 15.0,  # ms between streamed tokens
+    "tokens": 80,
+    "tts_latency": (250.0, 1200.0),
+    "tts_error_rate": 0.0,
+    "tts_ms_per_char": 60.0,  # audio duration per character of text
+    "ollama_model": "llama3.1:8b",
+}
+stats = Counter()
+
+WORDS = (
+    "Start with the largest surface, then work top to bottom. Keep a cloth "
+    "handy, put on some music and set a timer so the job stays small."
+).split()
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, mono: 417 bytes and 26 ms per frame
+MP3_FRAME = b"\xff\xfb\x90\xc4" + bytes(413)
+MP3_FRAME_MS = 1152 / 44.1
+
+
+def sample_latency(p50_ms: float, p99_ms: float) -> float:
+    """Seconds drawn from a lognormal with the given median and 99th percentile."""
+    if p50_ms <= 0:
+        return 0.0
+    sigma = math.log(max(p99_ms, p50_ms) / p50_ms) / 2.326
+    return random.lognormvariate(math.log(p50_ms), sigma) / 1000
+
+
+def failure(name: str, error_rate: float):
+    """An error response for a random share of calls, else None."""
+    if random.random() >= error_rate:
+        return None
+    stats[f"{name}_errors"] += 1
+    if random.random() < 0.5:
+        return JSONResponse(
+            {"error": {"message": "Rate limit reached", "type": "rate_limit"}},
+            status_code=429,
+            headers={"retry-after": "1"},
+        )
+    return JSONResponse({"error": {"message": "Upstream unavailable"}}, status_code=503)
+
+
+def tokens(limit: int):
+    count = min(settings["tokens"], limit or settings["tokens"])
+    return [WORDS[i % len(WORDS)] + " " for i in range(count)]
+
+
+# --- Groq (OpenAI-compatible chat completions) ---
+@app.post("/openai/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    stats["groq_requests"] += 1
+    error = failure("groq", settings["llm_error_rate"])
+    if error:
+        return error
+    await asyncio.sleep(sample_latency(*settings["llm_latency"]))
+
+    model = body.get("model", "fake")
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+    parts = tokens(body.get("max_tokens") or 0)
+
+    if not body.get("stream"):
+        # A non-streamed completion still takes as long as generating it
+        await asyncio.sleep(settings["token_delay"] * len(parts) / 1000)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(parts)},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": 100,
+                "completion_tokens": len(parts),
+                "total_tokens": 100 + len(parts),
+            },
+        }
+
+    def chunk(delta, finish_reason=None):
+        return "data: " + json.dumps(
+            {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [
+                    {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                ],
+            }
+        ) + "\n\n"
+
+    async def events():
+        yield chunk({"role": "assistant", "content": ""})
+        for part in parts:
+            await asyncio.sleep(settings["token_delay"] / 1000)
+            yield chunk({"content": part})
+        yield chunk({}, "stop")
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+# --- Ollama ---
+@app.get("/api/tags")
+async def ollama_tags():
+    return {"models": [{"name": settings["ollama_model"]}]}
+
+
+@app.post("/api/pull")
+async def ollama_pull():
+    return {"status": "success"}
+
+
+@app.post("/api/generate")
+async def ollama_generate(request: Request):
+    body = await request.json()
+    stats["ollama_requests"] += 1
+    error = failure("ollama", settings["llm_error_rate"])
+    if error:
+        return error
+    await asyncio.sleep(sample_latency(*settings["llm_latency"]))
+    parts = tokens(0)
+    model = body.get("model", settings["ollama_model"])
+
+    if not body.get("stream", True):
+        await asyncio.sleep(settings["token_delay"] * len(parts) / 1000)
+        return {"model": model, "response": "".join(parts), "done": True}
+
+    async def lines():
+        for part in parts:
+            await asyncio.sleep(settings["token_delay"] / 1000)
+            yield json.dumps({"model": model, "response": part, "done": False}) + "\n"
+        yield json.dumps({"model": model, "response": "", "done": True}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+# --- TTS ---
+@app.post("/tts")
+async def tts(request: Request):
+    body = await request.json()
+    stats["tts_requests"] += 1
+    error = failure("tts", settings["tts_error_rate"])
+    if error:
+        return error
+    await asyncio.sleep(sample_latency(*settings["tts_latency"]))
+
+    duration_ms = len(body.get("text", "")) * settings["tts_ms_per_char"]
+    frames = max(1, int(duration_ms / MP3_FRAME_MS))
+    audio = MP3_FRAME * frames
+
+    async def chunks():
+        for start in range(0, len(audio), 16384):
+            yield audio[start : start + 16384]
+            await asyncio.sleep(0)
+
+    return StreamingResponse(chunks(), media_type="audio/mpeg")
+
+
+@app.get("/stats")
+async def get_stats():
+    return dict(stats)
+
+
+@app.post("/stats/reset")
+async def reset_stats():
+    stats.clear()
+    return Response(status_code=204)
+
+
+def parse_latency(value: str):
+    """'p50,p99' in milliseconds (a single number means a fixed latency)."""
+    parts = [float(v) for v in value.split(",")]
+    return (parts[0], parts[-1])
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--llm-latency", type=parse_latency, default="300,1500",
+                        help="Groq/Ollama time to first token, p50,p99 in ms")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--token-delay", type=float, default=15.0,
+                        help="ms between streamed tokens")
+    parser.add_argument("--tokens", type=int, default=80, help="tokens per completion")
+    parser.add_argument("--tts-latency", type=parse_latency, default="250,1200",
+                        help="TTS time to first byte, p50,p99 in ms")
+    parser.add_argument("--tts-error-rate", type=float, default=0.0)
+    parser.add_argument("--tts-ms-per-char", type=float, default=60.0,
+                        help="audio duration generated per character of text")
+    parser.add_argument("--ollama-model", default="llama3.1:8b")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    for name in settings:
+        settings[name] = getattr(args, name)
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
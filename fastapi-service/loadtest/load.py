@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Open-loop load driver: replays a mixed request stream at a target rate and
+reports throughput, tail latency and error rate per route.
+
+Requests start on schedule whether or not earlier ones have finished, so a
+saturated server shows up as growing latency and errors rather than as a
+quietly lower request rate. Typical setup, with every upstream faked locally:
+
+  python loadtest/fake_upstreams.py --port 9100 &
+  cd app && GROQ_API_KEY=fake GROQ_BASE_URL=http://localhost:9100 \\
+      OLLAMA_BASE_URL=http://localhost:9100 TTS_UPSTREAM_URL=http://localhost:9100/tts \\
+      STORE_TO_GCS=false uvicorn main:app --port 8000 &
+  python loadtest/load.py --rps 50 --duration 60
+
+Usage:
+  python loadtest/load.py --base-url http://localhost:8000 --rps 100 --duration 30
+  python loadtest/load.py --mix chores=40,chore=40,tts=10,advice=10 --advice-unique 0.2
+  python loadtest/load.py --rps 20,40,80,160 --duration 30 --out capacity.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+DEFAULT_MIX = "chores=30,chore=40,tts=15,advice=15"
+SEARCH_TERMS = ["clean", "desk", "kitchen", "vinegar", "sponge", "wipe", "floor"]
+VOICE_IDS = ["default", "male", "female", "british"]
+
+
+class RouteStats:
+    def __init__(self):
+        self.latencies: List[float] = []  # seconds, successful requests
+        self.first_byte: List[float] = []
+        self.statuses: Dict[str, int] = defaultdict(int)
+        self.sent = 0
+        self.errors = 0
+        self.dropped = 0
+
+    def summary(self, elapsed: float) -> Dict:
+        def ms(values: List[float], q: float) -> Optional[float]:
+            if not values:
+                return None
+            ordered = sorted(values)
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000, 1)
+
+        ok = len(self.latencies)
+        return {
+            "sent": self.sent,
+            "ok": ok,
+            "errors": self.errors,
+            "dropped": self.dropped,
+            "error_rate": round(self.errors / self.sent, 4) if self.sent else 0.0,
+            "throughput_rps": round(ok / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": ms(self.latencies, 0.50),
+            "p90_ms": ms(self.latencies, 0.90),
+            "p99_ms": ms(self.latencies, 0.99),
+            "max_ms": ms(self.latencies, 1.0),
+            "ttfb_p50_ms": ms(self.first_byte, 0.50),
+            "ttfb_p99_ms": ms(self.first_byte, 0.99),
+            "statuses": dict(self.statuses),
+        }
+
+
+class LoadDriver:
+    def __init__(self, client: httpx.AsyncClient, chore_ids: List[str], args):
+        self.client = client
+        self.chore_ids = chore_ids
+        self.args = args
+        self.routes = {
+            "chores": self.list_chores,
+            "chore": self.get_chore,
+            "search": self.search,
+            "tts": self.tts,
+            "advice": self.advice,
+            "advice_stream": self.advice_stream,
+        }
+
+    # Each route builds one request: (method, url, json body)
+    def list_chores(self):
+        return "GET", "/chores", None
+
+    def get_chore(self):
+        return "GET", f"/chores/{random.choice(self.chore_ids)}", None
+
+    def search(self):
+        return "GET", f"/chores?q={random.choice(SEARCH_TERMS)}", None
+
+    def tts(self):
+        body = {"voice_id": random.choice(VOICE_IDS)}
+        if random.random() < self.args.tts_unique:
+            # Text nobody asked for before, so it misses every audio cache
+            body["text"] = f"Great job! Session {uuid.uuid4().hex[:8]}."
+        else:
+            body["chore_id"] = random.choice(self.chore_ids)
+        return "POST", "/tts", body
+
+    def _advice_body(self):
+        context = ""
+        if random.random() < self.args.advice_unique:
+            context = f"I have {random.randint(1, 10**6)} minutes"
+        return {"chore_id": random.choice(self.chore_ids), "user_context": context}
+
+    def advice(self):
+        return "POST", "/advice", self._advice_body()
+
+    def advice_stream(self):
+        return "POST", "/advice?stream=1", self._advice_body()
+
+    async def send(self, route: str, stats: RouteStats):
+        method, url, body = self.routes[route]()
+        started = time.perf_counter()
+        try:
+            async with self.client.stream(method, url, json=body) as response:
+                first_byte = None
+                async for _ in response.aiter_raw():
+                    if first_byte is None:
+                        first_byte = time.perf_counter() - started
+                elapsed = time.perf_counter() - started
+            stats.statuses[str(response.status_code)] += 1
+            if response.status_code >= 400:
+                stats.errors += 1
+                return
+            stats.latencies.append(elapsed)
+            stats.first_byte.append(first_byte if first_byte is not None else elapsed)
+        except httpx.HTTPError as e:
+            stats.statuses[type(e).__name__] += 1
+            stats.errors += 1
+        except asyncio.CancelledError:
+            # Still running when its step ended
+            stats.statuses["cancelled"] += 1
+            stats.errors += 1
+            raise
+
+    async def run(self, rps: float, duration: float, mix: Dict[str, float]) -> Dict:
+        routes = list(mix)
+        weights = [mix[r] for r in routes]
+        stats = {route: RouteStats() for route in routes}
+        inflight = set()
+
+        started = time.perf_counter()
+        next_at = started
+        while next_at - started < duration:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            route = random.choices(routes, weights)[0]
+            if len(inflight) >= self.args.max_inflight:
+                # Client-side limit reached: count it rather than block the schedule
+                stats[route].dropped += 1
+            else:
+                stats[route].sent += 1
+                task = asyncio.create_task(self.send(route, stats[route]))
+                inflight.add(task)
+                task.add_done_callback(inflight.discard)
+            # Poisson arrivals (or evenly spaced with --uniform)
+            next_at += 1 / rps if self.args.uniform else random.expovariate(rps)
+
+        if inflight:
+            _, pending = await asyncio.wait(inflight, timeout=self.args.timeout)
+            # Stragglers must not run on into the next step and skew its figures
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        elapsed = time.perf_counter() - started
+
+        per_route = {route: s.summary(elapsed) for route, s in stats.items()}
+        total = RouteStats()
+        for s in stats.values():
+            total.latencies += s.latencies
+            total.first_byte += s.first_byte
+            total.sent += s.sent
+            total.errors += s.errors
+            total.dropped += s.dropped
+            for status, count in s.statuses.items():
+                total.statuses[status] += count
+        return {
+            "target_rps": rps,
+            "offered_rps": round((total.sent + total.dropped) / duration, 2),
+            "seconds": round(elapsed, 2),
+            "total": total.summary(elapsed),
+            "routes": per_route,
+        }
+
+
+def print_report(result: Dict):
+    print(
+        f"\nTarget {result['target_rps']} rps, offered {result['offered_rps']} rps "
+        f"over {result['seconds']}s"
+    )
+    print(
+        f"{'route':<14} {'sent':>7} {'ok/s':>8} {'err%':>6} {'drop':>5} "
+        f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'ttfb p99':>9}"
+    )
+    rows = list(result["routes"].items()) + [("TOTAL", result["total"])]
+    for route, s in rows:
+        print(
+            f"{route:<14} {s['sent']:>7} {s['throughput_rps']:>8.1f} "
+            f"{s['error_rate'] * 100:>5.1f}% {s['dropped']:>5} "
+            f"{s['p50_ms'] or '-':>8} {s['p90_ms'] or '-':>8} {s['p99_ms'] or '-':>8} "
+            f"{s['ttfb_p99_ms'] or '-':>9}"
+        )
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        route, _, weight = part.partition("=")
+        mix[route.strip()] = float(weight or 1)
+    return {route: weight for route, weight in mix.items() if weight > 0}
+
+
+async def main_async(args) -> List[Dict]:
+    headers = {"X-API-Key": args.api_key} if args.api_key else {}
+    limits = httpx.Limits(
+        max_connections=args.max_inflight, max_keepalive_connections=args.max_inflight
+    )
+    async with httpx.AsyncClient(
+        base_url=args.base_url, headers=headers, limits=limits, timeout=args.timeout
+    ) as client:
+        response = await client.get("/chores", params={"fields": "id"})
+        response.raise_for_status()
+        data = response.json()
+        chores = data["chores"] if isinstance(data, dict) else data
+        chore_ids = [chore["id"] for chore in chores]
+        if not chore_ids:
+            raise SystemExit("The API returned no chores to request")
+
+        driver = LoadDriver(client, chore_ids, args)
+        unknown = set(args.mix) - set(driver.routes)
+        if unknown:
+            raise SystemExit(f"Unknown routes in --mix: {', '.join(sorted(unknown))}")
+
+        if args.warmup:
+            print(f"Warming up for {args.warmup}s...")
+            await driver.run(args.rps[0], args.warmup, args.mix)
+
+        results = []
+        for rps in args.rps:
+            result = await driver.run(rps, args.duration, args.mix)
+            print_report(result)
+            results.append(result)
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--api-key", default=os.getenv("INTERNAL_API_KEY", ""))
+    parser.add_argument("--rps", type=lambda v: [float(x) for x in v.split(",")],
+                        default=[20.0], help="target rate; a list runs one step per rate")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per step")
+    parser.add_argument("--warmup", type=float, default=5.0, help="seconds, not reported")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="route weights: chores, chore, search, tts, advice, advice_stream")
+    parser.add_argument("--tts-unique", type=float, default=0.1,
+                        help="share of /tts requests with never-seen text (cache misses)")
+    parser.add_argument("--advice-unique", type=float, default=0.1,
+                        help="share of /advice requests with unique user_context (cache misses)")
+    parser.add_argument("--max-inflight", type=int, default=1000,
+                        help="client-side cap on concurrent requests")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--uniform", action="store_true",
+                        help="evenly spaced arrivals instead of Poisson")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--out", default=None, help="write results as JSON")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    results = asyncio.run(main_async(args))
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(
+                {
+                    "base_url": args.base_url,
+                    "mix": args.mix,
+                    "duration": args.duration,
+                    "steps": results,
+                },
+                f,
+                indent=2,
+            )
+        print(f"\nSaved results to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+"""
+Point every app module at scratch data before any of them is imported
+"""
+
+import os
+import sys
+import tempfile
+
+TMP = tempfile.mkdtemp(prefix="chore-test-")
+os.environ["CHORES_DB_PATH"] = os.path.join(TMP, "chores.db")
+os.environ["TTS_CACHE_DIR"] = os.path.join(TMP, "tts_cache")
+os.environ.pop("INTERNAL_API_KEY", None)
+os.environ.pop("TTS_UPSTREAM_URL", None)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
@@ -0,0 +1,37 @@
+"""
+Background catalog reloads reuse one database connection
+"""
+
+import time
+
+import database
+from catalog import ChoreCatalog
+
+RELOADS = 30
+
+
+def wait_for_version(catalog: ChoreCatalog, version: int, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while catalog.version < version:
+        assert time.monotonic() < deadline, "catalog was not reloaded"
+        time.sleep(0.01)
+
+
+def test_reloads_do_not_open_new_connections():
+    database.init_database()
+    catalog = ChoreCatalog(check_interval=3600)
+    catalog.refresh(force=True)
+    connections = len(database._pool._connections)
+
+    for n in range(RELOADS):
+        version = catalog.version
+        assert database.add_chore(
+            {"id": f"reload-{n}", "title": f"Reload {n}", "items": [], "steps": []}
+        )
+        # A local write makes the next read schedule a background reload
+        catalog.get(f"reload-{n}")
+        wait_for_version(catalog, version + 1)
+        assert catalog.get(f"reload-{n}") is not None
+
+    # At most the refresher thread's own reader on top of what was open before
+    assert len(database._pool._connections) <= connections + 1
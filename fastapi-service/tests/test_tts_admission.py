@@ -0,0 +1,131 @@
+"""
+Concurrent uncached /tts requests get either a full clip or a clean 503
+"""
+
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+import main
+import tts_engine
+from tts_pool import SynthesisPool
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, mono
+MP3_FRAME = b"\xff\xfb\x90\xc4" + bytes(413)
+SYNTHESIS_SECONDS = 0.05
+
+
+class EngineCalls:
+    """Counts engine calls running at the same time."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def chunks(self, text: str, voice: str = tts_engine.DEFAULT_VOICE):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            time.sleep(SYNTHESIS_SECONDS)
+            yield MP3_FRAME * (1 + len(text) // 10)
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+def script(n: int) -> str:
+    # No segment is shared between clips, so every one of them misses the cache
+    return f"Clip number {n}. Wipe desk {n}. Put pen {n} away."
+
+
+def full_clip(text: str) -> bytes:
+    segments = tts_engine.split_segments(text)
+    return b"".join(MP3_FRAME * (1 + len(segment) // 10) for segment in segments)
+
+
+async def post_all(count: int, offset: int):
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await asyncio.gather(
+            *(
+                client.post("/tts", json={"text": script(n), "voice_id": "default"})
+                for n in range(offset, offset + count)
+            )
+        )
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    calls = EngineCalls()
+    monkeypatch.setattr(tts_engine, "gtts_chunks", calls.chunks)
+    return calls
+
+
+@pytest.fixture
+def pool(monkeypatch, engine):
+    def make(max_workers: int, max_queue: int) -> SynthesisPool:
+        synthesis_pool = SynthesisPool(max_workers=max_workers, max_queue=max_queue)
+        monkeypatch.setattr(main, "tts_pool", synthesis_pool)
+        return synthesis_pool
+
+    return make
+
+
+def test_overload_returns_full_clips_or_503(pool):
+    pool(max_workers=2, max_queue=2)
+    responses = asyncio.run(post_all(12, offset=0))
+
+    statuses = sorted({r.status_code for r in responses})
+    assert statuses == [200, 503]
+    for n, response in enumerate(responses):
+        if response.status_code == 200:
+            assert response.content == full_clip(script(n))
+        else:
+            assert response.headers["Retry-After"]
+
+
+def test_clip_admitted_once_for_all_segments(pool):
+    synthesis_pool = pool(max_workers=2, max_queue=8)
+    responses = asyncio.run(post_all(8, offset=100))
+
+    assert [r.status_code for r in responses] == [200] * 8
+    for n, response in enumerate(responses, start=100):
+        assert response.content == full_clip(script(n))
+    metrics = synthesis_pool.metrics()
+    assert metrics["submitted"] == 8
+    assert metrics["rejected"] == 0
+
+
+def test_engine_calls_capped_across_clips(pool, engine, monkeypatch):
+    monkeypatch.setattr(tts_engine, "_synthesis_slots", threading.BoundedSemaphore(2))
+    pool(max_workers=4, max_queue=8)
+    responses = asyncio.run(post_all(8, offset=200))
+
+    assert [r.status_code for r in responses] == [200] * 8
+    assert engine.peak <= 2
+
+
+def test_batch_leaves_a_worker_free(pool):
+    synthesis_pool = pool(max_workers=2, max_queue=8)
+    clips = [{"text": script(n), "voice_id": "default"} for n in range(300, 306)]
+    peak = 0
+
+    async def run_batch():
+        nonlocal peak
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            batch = asyncio.create_task(client.post("/tts/batch", json={"clips": clips}))
+            while not batch.done():
+                peak = max(peak, synthesis_pool.metrics()["active"])
+                await asyncio.sleep(0.005)
+            return await batch
+
+    response = asyncio.run(run_batch())
+    assert response.status_code == 200
+    assert all("url" in clip for clip in response.json()["clips"])
+    assert peak == 1